@@ -0,0 +1,323 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from functools import partial
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from catalog import ATTRIBUTES, VALUE_CODES, LEVEL_MEMBERS, CarCatalog, catalog, load_catalog
+from fuzzy_engine import PARAM_NAMES, FUZZIFICATION_TYPES, DEFUZZIFICATION_TYPES, FuzzyParamRegistry, \
+    fuzzy_registry
+from parallel import ParallelExecutor
+from profiling import profiler
+
+MODES = ("forward", "backward", "fuzzy")
+FORMATS = ("jsonl", "csv")
+
+# Поля результатов по режимам (порядок столбцов CSV)
+OUTPUT_FIELDS = {
+    "forward": ("query", "id", "cars", "error"),
+    "backward": ("query", "id", "name", "price", "error"),
+    "fuzzy": ("query", "id", "budget", "name", "price", "difference", "error"),
+}
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class MalformedRecord(dict):
+    """Строка JSONL, которую не удалось разобрать; для нее выводится запись об ошибке"""
+
+    def __init__(self, error: str):
+        super().__init__()
+        self.error = error
+
+
+def read_lines(file: TextIO) -> Iterator[Tuple[int, str]]:
+    """Непустые строки JSONL с их номерами в файле"""
+    for number, line in enumerate(file, 1):
+        if line.strip():
+            yield number, line
+
+
+def parse_line(number: int, line: str) -> dict:
+    """Запрос из строки JSONL; некорректная строка дает MalformedRecord"""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        return MalformedRecord(f"некорректный JSON в строке {number}: {e.msg}")
+    return record if isinstance(record, dict) else MalformedRecord(f"строка {number} не является объектом JSON")
+
+
+def read_records(file: TextIO, fmt: str) -> Iterator[dict]:
+    """Потоковое чтение запросов из JSONL или CSV"""
+    if fmt == "csv":
+        yield from csv.DictReader(file)
+    else:
+        for number, line in read_lines(file):
+            yield parse_line(number, line)
+
+
+def format_records(records: List[dict], fmt: str, fields: Iterable[str]) -> str:
+    """Текст результатов в JSONL или CSV (без заголовка)"""
+    if fmt == "csv":
+        stream = io.StringIO()
+        # Вложенные значения записываются в ячейку как JSON
+        csv.DictWriter(stream, fieldnames=tuple(fields), extrasaction="ignore").writerows(
+            {key: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+             for key, value in record.items()}
+            for record in records
+        )
+        return stream.getvalue()
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+class RecordWriter:
+    """Потоковая запись результатов в JSONL или CSV"""
+
+    def __init__(self, file: TextIO, fmt: str, fields: Iterable[str]):
+        self.file = file
+        self.fmt = fmt
+        self.fields = tuple(fields)
+        if fmt == "csv":
+            csv.DictWriter(file, fieldnames=self.fields).writeheader()
+
+    def write(self, records: List[dict]):
+        self.write_text(format_records(records, self.fmt, self.fields))
+
+    def write_text(self, text: str):
+        """Запись результатов, уже приведенных к формату (format_records)"""
+        self.file.write(text)
+        self.file.flush()
+
+
+def _field(record: dict, j: int):
+    """Значение атрибута j по английскому или русскому имени поля"""
+    if ATTRIBUTES[j] in record:
+        return record[ATTRIBUTES[j]]
+    if PARAM_NAMES[j] in record:
+        return record[PARAM_NAMES[j]]
+    raise KeyError(ATTRIBUTES[j])
+
+
+def _check_record(record: dict):
+    if isinstance(record, MalformedRecord):
+        raise ValueError(record.error)
+
+
+def parse_crisp_query(record: dict) -> tuple:
+    """Кортеж значений атрибутов для четкой ЭС"""
+    _check_record(record)
+    inputs = []
+    for j, attribute in enumerate(ATTRIBUTES):
+        value = str(_field(record, j)).strip()
+        if value not in VALUE_CODES[j]:
+            raise ValueError(f"недопустимое значение {attribute}: {value}")
+        inputs.append(LEVEL_MEMBERS[j][VALUE_CODES[j][value]])
+    return tuple(inputs)
+
+
+def parse_fuzzy_query(record: dict) -> List[float]:
+    """Значения входных параметров нечеткой ЭС от 1 до 10"""
+    _check_record(record)
+    values = []
+    for j, attribute in enumerate(ATTRIBUTES):
+        value = _field(record, j)
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            # Пустое поле (null в JSONL, недостающая ячейка CSV) или не число
+            raise ValueError(f"недопустимое значение {attribute}: {value!r}") from None
+    if not all(1 <= x <= 10 for x in values):
+        raise ValueError("Значения должны быть от 1 до 10")
+    return values
+
+
+def _result(index: int, record: dict, **fields) -> dict:
+    result = {"query": index}
+    if "id" in record:
+        result["id"] = record["id"]
+    result.update(fields)
+    return result
+
+
+def _error(index: int, record: dict, error: Exception) -> dict:
+    message = f"отсутствует поле {error}" if isinstance(error, KeyError) else str(error)
+    return _result(index, record, error=message)
+
+
+def process_forward(chunk: List[tuple], car_catalog: CarCatalog) -> List[dict]:
+    results = []
+    for index, record in chunk:
+        try:
+            inputs = parse_crisp_query(record)
+        except (KeyError, ValueError) as e:
+            results.append(_error(index, record, e))
+            continue
+        cars = [{"name": car.name, "matches": matches, "price": car.price}
+                for car, matches in car_catalog.forward_chaining(inputs)]
+        results.append(_result(index, record, cars=cars))
+    return results
+
+
+def process_backward(chunk: List[tuple], car_catalog: CarCatalog) -> List[dict]:
+    results = []
+    for index, record in chunk:
+        try:
+            inputs = parse_crisp_query(record)
+        except (KeyError, ValueError) as e:
+            results.append(_error(index, record, e))
+            continue
+        car = car_catalog.backward_chaining(inputs)
+        results.append(_result(index, record, name=car.name if car else None, price=car.price if car else None))
+    return results
+
+
+def process_fuzzy(chunk: List[tuple], car_catalog: CarCatalog, registry: FuzzyParamRegistry,
+                  fuzzification_type: str, defuzzification_type: str) -> List[dict]:
+    results: List[Optional[dict]] = [None] * len(chunk)
+    rows, positions = [], []
+    for position, (index, record) in enumerate(chunk):
+        try:
+            rows.append(parse_fuzzy_query(record))
+            positions.append(position)
+        except (KeyError, ValueError) as e:
+            results[position] = _error(index, record, e)
+
+    if rows:
+        # Все корректные запросы части обрабатываются одним векторизованным вызовом
+        _, budgets = registry.infer(np.array(rows), fuzzification_type, defuzzification_type)
+        try:
+            ids, diffs = car_catalog.closest_ids(budgets)
+        except ValueError as e:
+            # В каталоге нет автомобилей в продаже: ошибка записывается для каждого запроса
+            for position in positions:
+                results[position] = _error(*chunk[position], e)
+            return results
+        for position, budget, car_id, diff in zip(positions, budgets.tolist(), ids.tolist(), diffs.tolist()):
+            index, record = chunk[position]
+            results[position] = _result(index, record, budget=round(budget, 2), name=car_catalog.name(car_id),
+                                        price=int(car_catalog.prices[car_id]), difference=round(diff, 2))
+    return results
+
+
+def process_chunk(chunk: List[tuple], car_catalog: CarCatalog, registry: FuzzyParamRegistry, mode: str,
+                  fuzzification_type: str = "triangular",
+                  defuzzification_type: str = "center_of_gravity") -> List[dict]:
+    """Результаты для части пронумерованных запросов в выбранном режиме"""
+    if mode == "forward":
+        return process_forward(chunk, car_catalog)
+    elif mode == "backward":
+        return process_backward(chunk, car_catalog)
+    return process_fuzzy(chunk, car_catalog, registry, fuzzification_type, defuzzification_type)
+
+
+def process_serialized(chunk: List[tuple], car_catalog: CarCatalog, registry: FuzzyParamRegistry, mode: str,
+                       fmt: str = "jsonl", fuzzification_type: str = "triangular",
+                       defuzzification_type: str = "center_of_gravity") -> Tuple[int, str]:
+    """Разбор, обработка и запись части запросов; возвращает число запросов и текст результатов.
+
+    Для JSONL часть состоит из исходных строк (номер запроса, (номер строки, строка)),
+    поэтому в пуле процессов разбор и сериализация JSON выполняются в рабочих процессах.
+    """
+    if fmt == "jsonl":
+        chunk = [(index, parse_line(number, line)) for index, (number, line) in chunk]
+    results = process_chunk(chunk, car_catalog, registry, mode, fuzzification_type, defuzzification_type)
+    return len(results), format_records(results, fmt, OUTPUT_FIELDS[mode])
+
+
+def _chunks(records: Iterator, chunk_size: int) -> Iterator[List[tuple]]:
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(mode: str, input_file: TextIO, output_file: TextIO, fmt: str = "jsonl",
+        car_catalog: Optional[CarCatalog] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+        fuzzification_type: str = "triangular", defuzzification_type: str = "center_of_gravity",
+        defuzzification_mode: str = "grid", processes: int = 1) -> int:
+    """Потоковая обработка запросов частями по chunk_size; возвращает число обработанных запросов.
+
+    При processes > 1 части обрабатываются пулом процессов с каталогом в разделяемой памяти.
+    """
+    car_catalog = catalog if car_catalog is None else car_catalog
+    writer = RecordWriter(output_file, fmt, OUTPUT_FIELDS[mode])
+    count = 0
+
+    if processes > 1:
+        # Родительский процесс только режет вход на части и пишет готовый текст
+        records = read_lines(input_file) if fmt == "jsonl" else read_records(input_file, fmt)
+        function = partial(process_serialized, mode=mode, fmt=fmt, fuzzification_type=fuzzification_type,
+                           defuzzification_type=defuzzification_type)
+        with ParallelExecutor(car_catalog, processes=processes, defuzzification_mode=defuzzification_mode) as executor:
+            for chunk_count, text in executor.map(function, _chunks(enumerate(records), chunk_size)):
+                writer.write_text(text)
+                count += chunk_count
+        return count
+
+    chunks = _chunks(enumerate(read_records(input_file, fmt)), chunk_size)
+    function = partial(process_chunk, mode=mode, fuzzification_type=fuzzification_type,
+                       defuzzification_type=defuzzification_type)
+
+    if defuzzification_mode == "grid":
+        registry = fuzzy_registry
+    else:
+        registry = FuzzyParamRegistry(defuzzification_mode=defuzzification_mode)
+    for chunk in chunks:
+        writer.write(function(chunk, car_catalog, registry))
+        count += len(chunk)
+    return count
+
+
+def _detect_format(path: Optional[str]) -> str:
+    return "csv" if path and path.lower().endswith(".csv") else "jsonl"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Пакетная обработка запросов к экспертной системе подбора автомобиля")
+    parser.add_argument("mode", choices=MODES, help="режим: прямая, обратная цепочка или нечеткий вывод")
+    parser.add_argument("-i", "--input", help="файл запросов (по умолчанию stdin)")
+    parser.add_argument("-o", "--output", help="файл результатов (по умолчанию stdout)")
+    parser.add_argument("-f", "--format", choices=FORMATS, help="формат запросов и результатов")
+    parser.add_argument("-c", "--catalog", help="каталог автомобилей: снимок, CSV или JSONL")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="число запросов в одной части")
+    parser.add_argument("--fuzzification", choices=FUZZIFICATION_TYPES, default="triangular")
+    parser.add_argument("--defuzzification", choices=DEFUZZIFICATION_TYPES, default="center_of_gravity")
+    parser.add_argument("--analytic", action="store_true", help="точная дефаззификация без сетки")
+    parser.add_argument("-j", "--processes", type=int, default=1, help="число рабочих процессов")
+    parser.add_argument("--profile", action="store_true",
+                        help="вывести в stderr время этапов вывода в формате JSON (при -j 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    fmt = args.format or _detect_format(args.input)
+    car_catalog = load_catalog(args.catalog) if args.catalog else None
+
+    input_file = open(args.input, newline="", encoding="utf-8") if args.input else sys.stdin
+    output_file = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    if args.profile:
+        profiler.enable()
+    try:
+        run(args.mode, input_file, output_file, fmt, car_catalog, args.chunk_size, args.fuzzification,
+            args.defuzzification, "analytic" if args.analytic else "grid", args.processes)
+    except BrokenPipeError:
+        # Получатель закрыл поток (например, head); остаток вывода не нужен
+        sys.stdout = None
+    finally:
+        if args.input:
+            input_file.close()
+        if args.output:
+            output_file.close()
+        if args.profile:
+            print(json.dumps(profiler.report(), ensure_ascii=False, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
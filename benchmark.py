@@ -0,0 +1,176 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from catalog import ATTRIBUTES, LEVEL_MEMBERS, CarCatalog
+from fuzzy_engine import PARAM_NAMES, BUDGET_LEVELS, BUDGET_RANGE, DEFUZZIFICATION_TYPES, FuzzyEngine, \
+    compile_rules
+from knowledge_base import FUZZY_PARAMS
+
+DEFAULT_CATALOG_SIZES = (30, 10000, 1000000)
+DEFAULT_RULE_COUNTS = (30, 1000, 100000)
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_REPEATS = 20
+
+# Длина синтетических названий автомобилей (десятичный номер с ведущими нулями)
+NAME_DIGITS = 8
+
+
+def synthetic_catalog(n: int, seed: int = 0) -> CarCatalog:
+    """Каталог из n автомобилей со случайными атрибутами и ценами"""
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, 3, size=(n, len(ATTRIBUTES)), dtype=np.uint8)
+    prices = rng.integers(BUDGET_RANGE[0], BUDGET_RANGE[1], size=n, dtype=np.int64) // 1000 * 1000
+    ids = np.arange(n, dtype=np.int64)[:, None]
+    digits = (ids // 10 ** np.arange(NAME_DIGITS - 1, -1, -1)) % 10 + ord("0")
+    return CarCatalog(codes, prices, np.arange(n + 1, dtype=np.int64) * NAME_DIGITS,
+                      digits.astype(np.uint8).ravel())
+
+
+def synthetic_rules(n: int, seed: int = 0) -> List[dict]:
+    """n правил со случайными антецедентами и консеквентами"""
+    rng = np.random.default_rng(seed)
+    levels = [tuple(FUZZY_PARAMS[param]) for param in PARAM_NAMES]
+    antecedents = rng.integers(0, 3, size=(n, len(PARAM_NAMES)))
+    consequents = rng.integers(0, len(BUDGET_LEVELS), size=n)
+    return [
+        {"if": {param: levels[j][code] for j, (param, code) in enumerate(zip(PARAM_NAMES, row))},
+         "then": {"бюджет": BUDGET_LEVELS[consequent]}}
+        for row, consequent in zip(antecedents.tolist(), consequents.tolist())
+    ]
+
+
+def synthetic_queries(n: int, seed: int = 0) -> List[tuple]:
+    """n случайных запросов четкой ЭС"""
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, 3, size=(n, len(ATTRIBUTES)))
+    return [tuple(LEVEL_MEMBERS[j][code] for j, code in enumerate(row)) for row in codes.tolist()]
+
+
+def synthetic_profiles(n: int, seed: int = 0) -> np.ndarray:
+    """Матрица (n, 6) случайных входных профилей нечеткой ЭС"""
+    return np.random.default_rng(seed).uniform(1, 10, size=(n, len(PARAM_NAMES)))
+
+
+def measure(name: str, params: dict, calls: List[Callable], items_per_call: int = 1) -> dict:
+    """Время каждого вызова, пропускная способность и пиковая память.
+
+    Время замеряется без tracemalloc (он замедляет код с большим числом выделений памяти),
+    пиковая память - отдельным проходом по тем же вызовам.
+    """
+    calls[0]()  # прогрев
+    latencies = np.empty(len(calls))
+    for i, call in enumerate(calls):
+        started = time.perf_counter()
+        call()
+        latencies[i] = time.perf_counter() - started
+    tracemalloc.start()
+    for call in calls:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        "name": name,
+        "params": params,
+        "calls": len(calls),
+        "throughput_per_s": round(items_per_call * len(calls) / latencies.sum(), 3),
+        "latency_ms": {"mean": round(latencies.mean() * 1000, 6), "p50": round(p50, 6),
+                       "p90": round(p90, 6), "p99": round(p99, 6)},
+        "peak_memory_bytes": peak,
+    }
+
+
+def catalog_benchmarks(size: int, repeats: int, seed: int) -> List[dict]:
+    car_catalog = synthetic_catalog(size, seed)
+    queries = synthetic_queries(repeats, seed + 1)
+    budgets = np.random.default_rng(seed + 2).uniform(*BUDGET_RANGE, size=repeats)
+    batch_budgets = np.random.default_rng(seed + 3).uniform(*BUDGET_RANGE, size=(repeats, DEFAULT_BATCH_SIZE))
+    params = {"catalog_size": size}
+    return [
+        measure("forward_chaining", params, [lambda q=q: car_catalog.forward_chaining(q) for q in queries]),
+        measure("backward_chaining", params, [lambda q=q: car_catalog.backward_chaining(q) for q in queries]),
+        measure("top_k", dict(params, k=10), [lambda q=q: car_catalog.top_k(q, 10) for q in queries]),
+        measure("find_closest_car", params, [lambda b=b: car_catalog.closest_car(b) for b in budgets]),
+        measure("find_closest_car_batch", dict(params, batch_size=DEFAULT_BATCH_SIZE),
+                [lambda b=b: car_catalog.closest_ids(b) for b in batch_budgets], DEFAULT_BATCH_SIZE),
+    ]
+
+
+def rule_benchmarks(count: int, repeats: int, batch_size: int, seed: int) -> List[dict]:
+    rules = synthetic_rules(count, seed)
+    params = {"rule_count": count}
+    results = [measure("compile_rules", params, [lambda: compile_rules(rules)] * max(repeats // 10, 1))]
+    profiles = synthetic_profiles(batch_size, seed + 1)
+    single = synthetic_profiles(repeats, seed + 2)
+
+    for mode in ("grid", "analytic"):
+        engine = FuzzyEngine(rules=rules, defuzzification_mode=mode)
+        for defuzzification_type in DEFUZZIFICATION_TYPES:
+            case = dict(params, defuzzification_mode=mode, defuzzification_type=defuzzification_type)
+            results.append(measure("fuzzy_inference_batch", dict(case, batch_size=batch_size),
+                                   [lambda: engine.infer(profiles, defuzzification_type)] * max(repeats // 10, 1),
+                                   batch_size))
+            results.append(measure("fuzzy_inference", case,
+                                   [lambda x=x: engine.infer(x[None], defuzzification_type) for x in single]))
+    return results
+
+
+def run(catalog_sizes=DEFAULT_CATALOG_SIZES, rule_counts=DEFAULT_RULE_COUNTS, repeats: int = DEFAULT_REPEATS,
+        batch_size: int = DEFAULT_BATCH_SIZE, seed: int = 0) -> dict:
+    """Запуск всех замеров; результат в виде словаря, пригодного для JSON"""
+    results = []
+    for size in catalog_sizes:
+        results.extend(catalog_benchmarks(size, repeats, seed))
+    for count in rule_counts:
+        results.extend(rule_benchmarks(count, repeats, batch_size, seed))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def _sizes(value: str) -> List[int]:
+    return [int(float(part)) for part in value.split(",") if part]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Замеры производительности экспертной системы")
+    parser.add_argument("--catalog-sizes", type=_sizes, default=list(DEFAULT_CATALOG_SIZES),
+                        help="размеры синтетических каталогов через запятую, например 30,1e4,1e7")
+    parser.add_argument("--rule-counts", type=_sizes, default=list(DEFAULT_RULE_COUNTS),
+                        help="размеры синтетических баз правил через запятую")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="число замеров каждого случая")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="размер пакета нечеткого вывода")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="файл JSON с результатами (по умолчанию stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    report = run(args.catalog_sizes, args.rule_counts, args.repeats, args.batch_size, args.seed)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from fuzzy_engine import PARAM_NAMES, FUZZIFICATION_TYPES, DEFUZZIFICATION_TYPES, FuzzyEngine, FuzzyParamRegistry
+
+# Границы входных значений нечеткой ЭС
+INPUT_RANGE = (1.0, 10.0)
+
+# Число узлов сетки по каждой оси по умолчанию: узлы в целых значениях 1..10
+DEFAULT_POINTS = 10
+
+# Число узлов, вычисляемых движком за один вызов при построении
+BUILD_CHUNK_SIZE = 1 << 16
+
+# Число случайных точек для оценки ошибки интерполяции
+DEFAULT_ERROR_SAMPLES = 100000
+
+DIMENSIONS = len(PARAM_NAMES)
+
+# Смещения 2^6 = 64 вершин ячейки сетки: (64, 6) из нулей и единиц
+_CORNERS = (np.arange(1 << DIMENSIONS)[:, None] >> np.arange(DIMENSIONS)) & 1
+
+
+class BudgetSurface:
+    """Бюджеты нечеткого вывода, заранее вычисленные на равномерной сетке по [1, 10]^6.
+
+    Значения между узлами получаются полилинейной интерполяцией по 64 вершинам ячейки.
+    Массив узлов хранится в .npy файле и при загрузке отображается в память; в meta.json
+    записываются параметры сетки, типы фаззификации и дефаззификации и измеренная ошибка.
+    """
+
+    def __init__(self, values: np.ndarray, fuzzification_type: str, defuzzification_type: str,
+                 input_range=INPUT_RANGE, meta: Optional[dict] = None):
+        self.values = values
+        self.fuzzification_type = fuzzification_type
+        self.defuzzification_type = defuzzification_type
+        self.low, self.high = map(float, input_range)
+        self.points = values.shape[0]
+        self.step = (self.high - self.low) / (self.points - 1)
+        self.meta = dict(meta or {})
+        self._flat = values.reshape(-1)
+        strides = np.array([self.points ** (DIMENSIONS - 1 - d) for d in range(DIMENSIONS)], dtype=np.int64)
+        self._strides = strides
+        self._corner_offsets = _CORNERS @ strides
+
+    @classmethod
+    def build(cls, engine: FuzzyEngine, fuzzification_type: str = "triangular",
+              defuzzification_type: str = "center_of_gravity", points: int = DEFAULT_POINTS,
+              path: Optional[str] = None, input_range=INPUT_RANGE) -> "BudgetSurface":
+        """Вычисление бюджетов во всех points^6 узлах; при заданном path массив пишется сразу на диск"""
+        if points < 2:
+            raise ValueError("Число узлов по оси должно быть не меньше 2")
+        shape = (points,) * DIMENSIONS
+        if path is None:
+            values = np.empty(shape)
+        else:
+            os.makedirs(path, exist_ok=True)
+            values = np.lib.format.open_memmap(os.path.join(path, "values.npy"), mode="w+", dtype=float, shape=shape)
+        axis = np.linspace(*input_range, points)
+        flat = values.reshape(-1)
+        for start in range(0, flat.size, BUILD_CHUNK_SIZE):
+            stop = min(start + BUILD_CHUNK_SIZE, flat.size)
+            X = axis[np.stack(np.unravel_index(np.arange(start, stop), shape), axis=1)]
+            flat[start:stop] = engine.infer(X, defuzzification_type)[1]
+        meta = {"points": points, "defuzzification_mode": engine.defuzzification_mode}
+        surface = cls(values, fuzzification_type, defuzzification_type, input_range, meta)
+        if path is not None:
+            values.flush()
+            surface.save_meta(path)
+        return surface
+
+    def interpolate(self, X: np.ndarray) -> np.ndarray:
+        """Бюджеты (N,) для матрицы входов (N, 6) полилинейной интерполяцией"""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        position = (np.clip(X, self.low, self.high) - self.low) / self.step
+        cell = np.minimum(position.astype(np.int64), self.points - 2)
+        t = position - cell
+        # Вес вершины - произведение (1 - t) или t по осям в зависимости от бита ее номера;
+        # веса собираются внешними произведениями по осям 0-2 и 3-5 (бит d номера - ось d)
+        factors = np.stack([1 - t, t], axis=2)
+        low = factors[:, 0, None, None, :] * factors[:, 1, None, :, None] * factors[:, 2, :, None, None]
+        high = factors[:, 3, None, None, :] * factors[:, 4, None, :, None] * factors[:, 5, :, None, None]
+        weights = (high.reshape(-1, 8, 1) * low.reshape(-1, 1, 8)).reshape(-1, 64)
+        corners = self._flat[(cell @ self._strides)[:, None] + self._corner_offsets]
+        return (weights * corners).sum(axis=1)
+
+    def measure_error(self, engine: FuzzyEngine, samples: int = DEFAULT_ERROR_SAMPLES, seed: int = 0) -> dict:
+        """Ошибка интерполяции относительно точного вывода на случайных точках; сохраняется в meta"""
+        X = np.random.default_rng(seed).uniform(self.low, self.high, size=(samples, DIMENSIONS))
+        errors = np.abs(self.interpolate(X) - engine.infer(X, self.defuzzification_type)[1])
+        report = {
+            "samples": samples,
+            "max_abs_error": round(float(errors.max()), 2),
+            "mean_abs_error": round(float(errors.mean()), 2),
+            "p99_abs_error": round(float(np.percentile(errors, 99)), 2),
+        }
+        self.meta["error"] = report
+        return report
+
+    def save_meta(self, path: str):
+        meta = dict(self.meta, points=self.points, input_range=[self.low, self.high],
+                    fuzzification_type=self.fuzzification_type, defuzzification_type=self.defuzzification_type)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False, indent=2)
+
+    def save(self, path: str):
+        """Сохранение узлов и метаданных в папку path"""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "values.npy"), np.ascontiguousarray(self.values))
+        self.save_meta(path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "BudgetSurface":
+        """Загрузка поверхности; при mmap=True узлы отображаются в память без чтения"""
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as file:
+            meta = json.load(file)
+        values = np.load(os.path.join(path, "values.npy"), mmap_mode="r" if mmap else None)
+        return cls(values, meta.pop("fuzzification_type"), meta.pop("defuzzification_type"),
+                   meta.pop("input_range"), meta)
+
+
+def load_surfaces(paths: List[str]) -> Dict[tuple, BudgetSurface]:
+    """Поверхности по ключу (тип фаззификации, тип дефаззификации)"""
+    surfaces = {}
+    for path in paths:
+        surface = BudgetSurface.load(path)
+        surfaces[(surface.fuzzification_type, surface.defuzzification_type)] = surface
+    return surfaces
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Построение интерполируемой поверхности бюджета по [1, 10]^6")
+    parser.add_argument("-o", "--output", required=True, help="папка для values.npy и meta.json")
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS, help="число узлов сетки по каждой оси")
+    parser.add_argument("--fuzzification", choices=FUZZIFICATION_TYPES, default="triangular")
+    parser.add_argument("--defuzzification", choices=DEFUZZIFICATION_TYPES, default="center_of_gravity")
+    parser.add_argument("--analytic", action="store_true", help="точная дефаззификация без сетки")
+    parser.add_argument("--samples", type=int, default=DEFAULT_ERROR_SAMPLES,
+                        help="число случайных точек для оценки ошибки (0 - не оценивать)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    registry = FuzzyParamRegistry(defuzzification_mode="analytic" if args.analytic else "grid")
+    engine = registry.engine(args.fuzzification)
+    surface = BudgetSurface.build(engine, args.fuzzification, args.defuzzification, args.points, args.output)
+    if args.samples > 0:
+        surface.measure_error(engine, args.samples)
+        surface.save_meta(args.output)
+    print(json.dumps(surface.meta, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,603 @@
+import csv
+import json
+import os
+import numpy as np
+from array import array
+from functools import lru_cache
+from typing import List, Dict, Tuple, Sequence, Optional, Iterable
+
+from knowledge_base import Power, MaxSpeed, Clearance, TrunkVolume, FuelConsumption, Dynamics, CarSpecs, cars
+from profiling import profiler
+
+# Атрибуты автомобиля в порядке входного кортежа четкой ЭС
+ATTRIBUTES = ("power", "max_speed", "clearance", "trunk_volume", "fuel_consumption", "dynamics")
+ATTRIBUTE_ENUMS = (Power, MaxSpeed, Clearance, TrunkVolume, FuelConsumption, Dynamics)
+
+# Коды уровней: 0 - низкий/маленький, 1 - средний, 2 - высокий/большой
+LEVEL_CODES = tuple(
+    {member: code for code, member in enumerate(reversed(list(enum)))}
+    for enum in ATTRIBUTE_ENUMS
+)
+
+# Значения атрибутов по кодам уровней
+LEVEL_MEMBERS = tuple(tuple(reversed(list(enum))) for enum in ATTRIBUTE_ENUMS)
+
+# Коды уровней по строковым значениям и именам членов перечислений (для загрузки из файлов)
+VALUE_CODES = tuple(
+    {**{member.value: code for member, code in codes.items()},
+     **{member.name: code for member, code in codes.items()},
+     **{member.name.lower(): code for member, code in codes.items()}}
+    for codes in LEVEL_CODES
+)
+
+# Столбцы файлов каталога
+CATALOG_FIELDS = ("name",) + ATTRIBUTES + ("price",)
+
+# Массивы таблицы готовых ответов четкой ЭС (списки в формате смещения + номера)
+ANSWER_ARRAYS = ("exact_offsets", "exact_ids", "answer_offsets", "answer_ids")
+
+# Массивы групп автомобилей с одинаковым профилем
+GROUP_ARRAYS = ("group_offsets", "group_members", "group_prices")
+
+# Массивы бинарного снимка каталога, каждый хранится в отдельном .npy файле
+SNAPSHOT_ARRAYS = ("codes", "packed", "prices", "active", "name_offsets", "name_data",
+                   "price_order", "sorted_prices") + ANSWER_ARRAYS + GROUP_ARRAYS
+
+# Тип номеров автомобилей в списках таблицы ответов и групп профилей
+ID_DTYPE = np.int32
+
+# На каждый атрибут отводится 2 бита упакованного профиля
+BITS_PER_ATTRIBUTE = 2
+PROFILE_BITS = BITS_PER_ATTRIBUTE * len(ATTRIBUTES)
+_FIELD_SHIFTS = np.arange(len(ATTRIBUTES), dtype=np.uint16) * BITS_PER_ATTRIBUTE
+
+
+def _mismatch_table() -> np.ndarray:
+    """Число ненулевых 2-битных полей для каждого 12-битного значения"""
+    values = np.arange(1 << PROFILE_BITS, dtype=np.uint16)
+    fields = (values[:, None] >> _FIELD_SHIFTS) & 0b11
+    return (fields != 0).sum(axis=1).astype(np.int8)
+
+
+# Число несовпавших атрибутов по XOR двух упакованных профилей
+MISMATCH_TABLE = _mismatch_table()
+
+
+def level_code(j: int, value) -> int:
+    """Код уровня атрибута j по члену перечисления, его строковому значению или имени"""
+    if isinstance(value, ATTRIBUTE_ENUMS[j]):
+        return LEVEL_CODES[j][value]
+    if isinstance(value, str) and value.strip() in VALUE_CODES[j]:
+        return VALUE_CODES[j][value.strip()]
+    raise ValueError(f"недопустимое значение {ATTRIBUTES[j]}: {value!r}")
+
+
+def encode_profile(inputs: Sequence) -> np.ndarray:
+    """Коды уровней (6,) для кортежа значений атрибутов"""
+    return np.array([LEVEL_CODES[j][value] for j, value in enumerate(inputs)], dtype=np.uint8)
+
+
+def pack_codes(codes: np.ndarray) -> np.ndarray:
+    """Упаковка кодов (..., 6) в 12-битные целые"""
+    return (np.asarray(codes, dtype=np.uint16) << _FIELD_SHIFTS).sum(axis=-1, dtype=np.uint16)
+
+
+def car_profile(car: CarSpecs) -> tuple:
+    """Кортеж значений атрибутов автомобиля"""
+    return tuple(getattr(car, attribute) for attribute in ATTRIBUTES)
+
+
+# Число всех сочетаний уровней атрибутов (3^6) и веса разрядов номера сочетания
+COMBINATIONS = 3 ** len(ATTRIBUTES)
+_COMBINATION_WEIGHTS = 3 ** np.arange(len(ATTRIBUTES), dtype=np.int64)
+
+# Коды уровней (729, 6) и упакованные профили (729,) всех сочетаний
+COMBINATION_CODES = (np.arange(COMBINATIONS)[:, None] // _COMBINATION_WEIGHTS % 3).astype(np.uint8)
+COMBINATION_PACKED = pack_codes(COMBINATION_CODES)
+
+# Число несовпавших атрибутов для каждой пары сочетаний (729, 729)
+COMBINATION_DISTANCES = MISMATCH_TABLE[COMBINATION_PACKED[:, None] ^ COMBINATION_PACKED[None, :]]
+
+# Порог совпадений прямой цепочки, для которого хранятся готовые ответы
+ANSWER_MIN_MATCHES = 5
+
+
+def combination_index(codes: np.ndarray) -> np.ndarray:
+    """Номера сочетаний (0..728) для кодов уровней (..., 6)"""
+    return (np.asarray(codes, dtype=np.int64) * _COMBINATION_WEIGHTS).sum(axis=-1)
+
+
+def query_combination(inputs: Sequence) -> int:
+    """Номер сочетания для кортежа значений атрибутов"""
+    return sum(LEVEL_CODES[j][value] * 3 ** j for j, value in enumerate(inputs))
+
+
+def _split(offsets: np.ndarray, ids: np.ndarray) -> List[np.ndarray]:
+    return [ids[offsets[c]:offsets[c + 1]] for c in range(offsets.size - 1)]
+
+
+def _join(lists: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([values.size for values in lists], out=offsets[1:])
+    return offsets, np.concatenate(lists).astype(ID_DTYPE, copy=False)
+
+
+@lru_cache(maxsize=None)
+def combination_neighbors(min_matches: int) -> Tuple[np.ndarray, ...]:
+    """Для каждого сочетания - сочетания, совпадающие с ним не менее чем по min_matches атрибутам"""
+    return tuple(np.flatnonzero(distances <= len(ATTRIBUTES) - min_matches) for distances in COMBINATION_DISTANCES)
+
+
+class CrispAnswerTable:
+    """Готовые ответы четкой ЭС для всех 729 сочетаний уровней.
+
+    exact[c] - автомобили с профилем c (обратная цепочка), forward[c] - автомобили,
+    совпадающие с c не менее чем по min_matches атрибутам (прямая цепочка). Списки
+    отсортированы по номеру в каталоге. При добавлении или удалении автомобиля
+    заменяются только списки соседних сочетаний, остальные не копируются.
+    """
+
+    def __init__(self, exact: List[np.ndarray], forward: List[np.ndarray], min_matches: int = ANSWER_MIN_MATCHES):
+        self.exact = exact
+        self.forward = forward
+        self.min_matches = min_matches
+        # Сочетания, отличающиеся от данного не более чем на допустимое число атрибутов
+        self.neighbors = combination_neighbors(min_matches)
+
+    @classmethod
+    def build(cls, codes: np.ndarray, min_matches: int = ANSWER_MIN_MATCHES,
+              ids: Optional[np.ndarray] = None) -> "CrispAnswerTable":
+        """Построение таблицы по кодам уровней каталога (N, 6); ids - учитываемые автомобили"""
+        combinations = combination_index(codes if ids is None else codes[ids])
+        order = np.argsort(combinations, kind="stable")
+        if ids is not None:
+            order = ids[order]
+        order = order.astype(ID_DTYPE)
+        exact = np.split(order, np.cumsum(np.bincount(combinations, minlength=COMBINATIONS))[:-1])
+        table = cls(exact, [], min_matches)
+        table.forward = [np.sort(np.concatenate([exact[m] for m in neighbors]), kind="stable")
+                         for neighbors in table.neighbors]
+        return table
+
+    @classmethod
+    def from_arrays(cls, exact_offsets: np.ndarray, exact_ids: np.ndarray, answer_offsets: np.ndarray,
+                    answer_ids: np.ndarray) -> "CrispAnswerTable":
+        """Таблица поверх массивов ANSWER_ARRAYS без копирования"""
+        return cls(_split(exact_offsets, exact_ids), _split(answer_offsets, answer_ids))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        exact_offsets, exact_ids = _join(self.exact)
+        answer_offsets, answer_ids = _join(self.forward)
+        return {"exact_offsets": exact_offsets, "exact_ids": exact_ids,
+                "answer_offsets": answer_offsets, "answer_ids": answer_ids}
+
+    def first(self, combination: int) -> int:
+        """Первый автомобиль с профилем combination или -1"""
+        ids = self.exact[combination]
+        return int(ids[0]) if ids.size else -1
+
+    def copy(self) -> "CrispAnswerTable":
+        """Копия таблицы, разделяющая с исходной сами списки"""
+        return type(self)(list(self.exact), list(self.forward), self.min_matches)
+
+    def add(self, car_id: int, combination: int):
+        """Учет автомобиля car_id с профилем combination"""
+        self.exact[combination] = _insert(self.exact[combination], car_id)
+        for c in self.neighbors[combination]:
+            self.forward[c] = _insert(self.forward[c], car_id)
+
+    def remove(self, car_id: int, combination: int):
+        """Исключение автомобиля car_id с профилем combination"""
+        self.exact[combination] = _delete(self.exact[combination], car_id)
+        for c in self.neighbors[combination]:
+            self.forward[c] = _delete(self.forward[c], car_id)
+
+
+class ProfileGroups:
+    """Автомобили, сгруппированные по профилю: не более 729 групп при любом размере каталога.
+
+    members[c] - номера автомобилей с профилем c по возрастанию цены (при равной цене -
+    по номеру в каталоге), prices[c] - их цены. Запрос оценивает каждый профиль один раз,
+    а затем раскрывает подходящие группы.
+    """
+
+    def __init__(self, members: List[np.ndarray], prices: List[np.ndarray]):
+        self.members = members
+        self.prices = prices
+
+    @classmethod
+    def build(cls, codes: np.ndarray, prices: np.ndarray, ids: Optional[np.ndarray] = None) -> "ProfileGroups":
+        """Группировка каталога по кодам уровней (N, 6) и ценам (N,); ids - учитываемые автомобили"""
+        if ids is None:
+            ids = np.arange(prices.size)
+        combinations = combination_index(codes[ids])
+        order = ids[np.lexsort((ids, prices[ids], combinations))].astype(ID_DTYPE)
+        bounds = np.cumsum(np.bincount(combinations, minlength=COMBINATIONS))[:-1]
+        return cls(np.split(order, bounds), np.split(prices[order], bounds))
+
+    @classmethod
+    def from_arrays(cls, group_offsets: np.ndarray, group_members: np.ndarray,
+                    group_prices: np.ndarray) -> "ProfileGroups":
+        """Группы поверх массивов GROUP_ARRAYS без копирования"""
+        return cls(_split(group_offsets, group_members), _split(group_offsets, group_prices))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        group_offsets, group_members = _join(self.members)
+        return {"group_offsets": group_offsets, "group_members": group_members,
+                "group_prices": np.concatenate(self.prices).astype(np.int64)}
+
+    def profiles(self) -> np.ndarray:
+        """Номера сочетаний, для которых в каталоге есть автомобили"""
+        return np.flatnonzero([ids.size for ids in self.members])
+
+    def copy(self) -> "ProfileGroups":
+        """Копия групп, разделяющая с исходными сами списки"""
+        return type(self)(list(self.members), list(self.prices))
+
+    def matching(self, combination: int, min_matches: int) -> np.ndarray:
+        """Непустые группы, совпадающие с combination не менее чем по min_matches атрибутам"""
+        profiles = self.profiles()
+        distances = COMBINATION_DISTANCES[combination][profiles]
+        return profiles[distances <= len(ATTRIBUTES) - min_matches]
+
+    def expand(self, profiles: Iterable[int]) -> np.ndarray:
+        """Номера автомобилей выбранных групп"""
+        lists = [self.members[c] for c in profiles]
+        return np.concatenate(lists) if lists else np.empty(0, dtype=ID_DTYPE)
+
+    def nearest(self, combination: int, k: int, target_price: Optional[float] = None) -> np.ndarray:
+        """До k лучших по цене автомобилей группы: самых дешевых или ближайших к target_price"""
+        members, prices = self.members[combination], self.prices[combination]
+        if target_price is None:
+            stop = min(k, prices.size)
+            # Автомобили с той же ценой, что и последний, тоже остаются кандидатами
+            return members[:np.searchsorted(prices, prices[stop - 1], side="right")] if stop else members
+        position = int(np.searchsorted(prices, target_price))
+        start = max(position - k, 0)
+        stop = min(position + k, prices.size)
+        if stop <= start:
+            return members[:0]
+        start = int(np.searchsorted(prices, prices[start], side="left"))
+        stop = int(np.searchsorted(prices, prices[stop - 1], side="right"))
+        return members[start:stop]
+
+    def add(self, car_id: int, combination: int, price: int):
+        """Добавление автомобиля в группу с сохранением порядка по цене"""
+        members, prices = self.members[combination], self.prices[combination]
+        position = _price_position(members, prices, car_id, price)
+        self.members[combination] = np.insert(members, position, car_id)
+        self.prices[combination] = np.insert(prices, position, price)
+
+    def remove(self, car_id: int, combination: int, price: int):
+        """Удаление автомобиля из группы"""
+        members, prices = self.members[combination], self.prices[combination]
+        position = _price_position(members, prices, car_id, price)
+        if position < members.size and members[position] == car_id:
+            self.members[combination] = np.delete(members, position)
+            self.prices[combination] = np.delete(prices, position)
+
+
+def _price_position(members: np.ndarray, prices: np.ndarray, car_id: int, price: int) -> int:
+    """Позиция автомобиля в группе, упорядоченной по (цена, номер)"""
+    start = int(np.searchsorted(prices, price, side="left"))
+    stop = int(np.searchsorted(prices, price, side="right"))
+    return start + int(np.searchsorted(members[start:stop], car_id))
+
+
+def _insert(ids: np.ndarray, car_id: int) -> np.ndarray:
+    return np.insert(ids, np.searchsorted(ids, car_id), car_id)
+
+
+def _delete(ids: np.ndarray, car_id: int) -> np.ndarray:
+    position = np.searchsorted(ids, car_id)
+    if position < ids.size and ids[position] == car_id:
+        return np.delete(ids, position)
+    return ids
+
+
+class CarCatalog:
+    """Столбцовый каталог автомобилей.
+
+    Атрибуты хранятся кодами uint8 и упакованными профилями, цены - в int64, названия -
+    в одном буфере UTF-8 со смещениями. Все массивы можно сохранить в бинарный снимок
+    и отобразить в память при загрузке; объекты CarSpecs создаются только для результатов.
+    """
+
+    def __init__(self, codes: np.ndarray, prices: np.ndarray, name_offsets: np.ndarray, name_data: np.ndarray,
+                 indexes: Optional[Dict[str, np.ndarray]] = None, active: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.prices = prices
+        self.name_offsets = name_offsets
+        self.name_data = name_data
+        # Снятые с продажи автомобили остаются в массивах, но исключены из всех индексов
+        self.active = np.ones(prices.size, dtype=bool) if active is None else active
+        self.listed = int(np.count_nonzero(self.active))
+        if indexes is None:
+            indexes = self._build_indexes()
+        self.packed = indexes["packed"]
+        # Индекс по цене: устойчивая сортировка сохраняет порядок каталога для равных цен
+        self.price_order = indexes["price_order"]
+        self.sorted_prices = indexes["sorted_prices"]
+        listed_ids = None if self.listed == prices.size else np.flatnonzero(self.active)
+        # Таблица ответов на все 729 запросов четкой ЭС; в старых снимках ее нет, и она строится заново
+        if all(name in indexes for name in ANSWER_ARRAYS):
+            self.answers = CrispAnswerTable.from_arrays(*(indexes[name] for name in ANSWER_ARRAYS))
+        else:
+            self.answers = CrispAnswerTable.build(self.codes, ids=listed_ids)
+        # Группы автомобилей с одинаковым профилем, упорядоченные по цене
+        if all(name in indexes for name in GROUP_ARRAYS):
+            self.groups = ProfileGroups.from_arrays(*(indexes[name] for name in GROUP_ARRAYS))
+        else:
+            self.groups = ProfileGroups.build(self.codes, self.prices, listed_ids)
+
+    @classmethod
+    def from_parts(cls, codes: np.ndarray, prices: np.ndarray, name_offsets: np.ndarray, name_data: np.ndarray,
+                   active: np.ndarray, listed: int, packed: np.ndarray, price_order: np.ndarray,
+                   sorted_prices: np.ndarray,
+                   answers: CrispAnswerTable, groups: ProfileGroups) -> "CarCatalog":
+        """Каталог из готовых массивов и объектов индексов без проверок и перестроения"""
+        car_catalog = cls.__new__(cls)
+        car_catalog.__dict__.update(
+            codes=codes, prices=prices, name_offsets=name_offsets, name_data=name_data, active=active,
+            listed=listed, packed=packed, price_order=price_order, sorted_prices=sorted_prices,
+            answers=answers, groups=groups)
+        return car_catalog
+
+    @classmethod
+    def from_cars(cls, car_list: List[CarSpecs]) -> "CarCatalog":
+        """Каталог из списка CarSpecs"""
+        return cls.from_records(
+            {"name": car.name, "price": car.price, **dict(zip(ATTRIBUTES, car_profile(car)))} for car in car_list
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "CarCatalog":
+        """Каталог из словарей с полями CATALOG_FIELDS.
+
+        Значения атрибутов - члены перечислений, их строковые значения или имена.
+        """
+        codes = bytearray()
+        prices = array("q")
+        name_offsets = array("q", [0])
+        name_data = bytearray()
+        for record in records:
+            for j, attribute in enumerate(ATTRIBUTES):
+                codes.append(level_code(j, record[attribute]))
+            prices.append(int(float(record["price"])))
+            name_data += str(record["name"]).encode("utf-8")
+            name_offsets.append(len(name_data))
+        return cls(
+            codes=np.frombuffer(codes, dtype=np.uint8).reshape(-1, len(ATTRIBUTES)).copy(),
+            prices=np.frombuffer(prices, dtype=np.int64).copy(),
+            name_offsets=np.frombuffer(name_offsets, dtype=np.int64).copy(),
+            name_data=np.frombuffer(bytes(name_data), dtype=np.uint8).copy(),
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "CarCatalog":
+        """Каталог из готовых массивов SNAPSHOT_ARRAYS без перестроения индексов"""
+        arrays = dict(arrays)
+        active = arrays.pop("active", None)  # в старых снимках нет снятых с продажи
+        return cls(arrays.pop("codes"), arrays.pop("prices"), arrays.pop("name_offsets"), arrays.pop("name_data"),
+                   indexes=arrays, active=active)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Все массивы каталога и индексов по именам SNAPSHOT_ARRAYS"""
+        arrays = {name: getattr(self, name) for name in SNAPSHOT_ARRAYS
+                  if name not in ANSWER_ARRAYS and name not in GROUP_ARRAYS}
+        arrays.update(self.answers.arrays())
+        arrays.update(self.groups.arrays())
+        return arrays
+
+    @classmethod
+    def load_snapshot(cls, path: str, mmap: bool = True) -> "CarCatalog":
+        """Загрузка бинарного снимка; при mmap=True массивы отображаются в память без чтения"""
+        files = {name: os.path.join(path, f"{name}.npy") for name in SNAPSHOT_ARRAYS}
+        return cls.from_arrays({name: np.load(file, mmap_mode="r" if mmap else None)
+                                for name, file in files.items() if os.path.exists(file)})
+
+    def save_snapshot(self, path: str):
+        """Сохранение каталога вместе с индексами в каталог path"""
+        os.makedirs(path, exist_ok=True)
+        for name, values in self.arrays().items():
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(values))
+
+    def __len__(self) -> int:
+        """Число строк каталога, включая снятые с продажи автомобили"""
+        return self.prices.size
+
+    def snapshot(self) -> "CarCatalog":
+        """Неизменяемый каталог сам является своим снимком (как LiveCatalog.snapshot)"""
+        return self
+
+    def listed_ids(self) -> np.ndarray:
+        """Номера автомобилей, не снятых с продажи"""
+        return np.flatnonzero(self.active)
+
+    def _build_indexes(self) -> Dict[str, np.ndarray]:
+        """Упакованные профили и индекс по цене"""
+        price_order = np.argsort(self.prices, kind="stable")
+        if self.listed < self.prices.size:
+            price_order = price_order[self.active[price_order]]
+        return {
+            "packed": pack_codes(self.codes),
+            "price_order": price_order,
+            "sorted_prices": self.prices[price_order],
+        }
+
+    def name(self, i: int) -> str:
+        """Название автомобиля с номером i"""
+        return bytes(self.name_data[self.name_offsets[i]:self.name_offsets[i + 1]]).decode("utf-8")
+
+    def car(self, i: int) -> CarSpecs:
+        """Объект CarSpecs для автомобиля с номером i"""
+        i = int(i)
+        levels = (LEVEL_MEMBERS[j][code] for j, code in enumerate(self.codes[i]))
+        return CarSpecs(self.name(i), *levels, int(self.prices[i]))
+
+    def exact_match_ids(self, inputs: Sequence) -> np.ndarray:
+        """Номера автомобилей, совпадающих по всем атрибутам, из таблицы ответов"""
+        return self.answers.exact[query_combination(inputs)]
+
+    def backward_chaining(self, inputs: Sequence) -> Optional[CarSpecs]:
+        """Первый в порядке каталога автомобиль, совпадающий по всем атрибутам"""
+        with profiler.stage("backward_chaining"):
+            car_id = self.answers.first(query_combination(inputs))
+            return self.car(car_id) if car_id >= 0 else None
+
+    def exact_matches(self, inputs: Sequence) -> List[CarSpecs]:
+        """Все автомобили, совпадающие по всем атрибутам, в порядке каталога"""
+        return [self.car(i) for i in self.exact_match_ids(inputs)]
+
+    def closest_ids(self, budgets) -> Tuple[np.ndarray, np.ndarray]:
+        """Номера автомобилей с ценой, ближайшей к каждому бюджету, и модули разницы.
+
+        При равной разнице выбирается автомобиль, стоящий в каталоге раньше. Если в продаже
+        нет ни одного автомобиля, выбирать не из чего, и возникает ValueError.
+        """
+        budgets = np.asarray(budgets, dtype=float)
+        sorted_prices = self.sorted_prices
+        if not sorted_prices.size:
+            raise ValueError("в каталоге нет автомобилей в продаже")
+        position = np.searchsorted(sorted_prices, budgets, side="left")
+        right = np.minimum(position, sorted_prices.size - 1)
+        # Первый автомобиль в группе с ценой соседа слева - с наименьшим номером в каталоге
+        left = np.searchsorted(sorted_prices, sorted_prices[np.maximum(position - 1, 0)], side="left")
+        right_ids = self.price_order[right]
+        left_ids = self.price_order[left]
+        right_diff = np.abs(sorted_prices[right] - budgets)
+        left_diff = np.abs(sorted_prices[left] - budgets)
+        take_left = (left_diff < right_diff) | ((left_diff == right_diff) & (left_ids < right_ids))
+        return np.where(take_left, left_ids, right_ids), np.where(take_left, left_diff, right_diff)
+
+    def closest_car(self, budget: float) -> Tuple[CarSpecs, float]:
+        """Автомобиль с наиболее близкой к бюджету ценой"""
+        ids, diffs = self.closest_ids(budget)
+        return self.car(ids), float(diffs)
+
+    def k_closest_ids(self, budget: float, k: int) -> np.ndarray:
+        """Номера k автомобилей с ценами, ближайшими к бюджету, по возрастанию разницы"""
+        k = min(k, self.sorted_prices.size)
+        position = int(np.searchsorted(self.sorted_prices, budget))
+        # k ближайших цен лежат в окне из k позиций по обе стороны от точки вставки
+        start = max(position - k, 0)
+        stop = min(position + k, self.sorted_prices.size)
+        if stop <= start:
+            return self.price_order[:0]
+        # Окно расширяется на все автомобили с той же ценой, что и на его границах
+        start = int(np.searchsorted(self.sorted_prices, self.sorted_prices[start], side="left"))
+        stop = int(np.searchsorted(self.sorted_prices, self.sorted_prices[stop - 1], side="right"))
+        window = self.price_order[start:stop]
+        diffs = np.abs(self.sorted_prices[start:stop] - budget)
+        return window[np.lexsort((window, diffs))[:k]]
+
+    def k_closest_cars(self, budget: float, k: int = 5) -> List[Tuple[CarSpecs, float]]:
+        """k автомобилей с ценами, ближайшими к бюджету, и разница с бюджетом"""
+        return [(self.car(i), abs(float(self.prices[i]) - budget)) for i in self.k_closest_ids(budget, k)]
+
+    def price_range_ids(self, low: float, high: float) -> np.ndarray:
+        """Номера автомобилей с ценой в диапазоне [low, high] по возрастанию цены"""
+        start = np.searchsorted(self.sorted_prices, low, side="left")
+        stop = np.searchsorted(self.sorted_prices, high, side="right")
+        return self.price_order[start:stop]
+
+    def cars_within(self, budget: float, delta: float) -> List[CarSpecs]:
+        """Автомобили с ценой в пределах ±delta от бюджета по возрастанию цены"""
+        return [self.car(i) for i in self.price_range_ids(budget - delta, budget + delta)]
+
+    def match_counts(self, inputs: Sequence) -> np.ndarray:
+        """Число совпавших атрибутов (N,) для каждого автомобиля каталога (у снятых с продажи - 0)"""
+        query = pack_codes(encode_profile(inputs))
+        counts = len(ATTRIBUTES) - MISMATCH_TABLE[self.packed ^ query]
+        return counts if self.listed == counts.size else np.where(self.active, counts, 0)
+
+    def match_scores(self, inputs: Sequence, weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """Число совпадений или взвешенная сумма совпавших атрибутов для каждого автомобиля"""
+        if weights is None:
+            return self.match_counts(inputs)
+        scores = (self.codes == encode_profile(inputs)) @ np.asarray(weights, dtype=float)
+        return scores if self.listed == scores.size else np.where(self.active, scores, 0.0)
+
+    def top_k(self, inputs: Sequence, k: int = 5, weights: Optional[Sequence[float]] = None,
+              target_price: Optional[float] = None) -> List[Tuple[CarSpecs, float]]:
+        """k наиболее похожих автомобилей по убыванию оценки совпадения.
+
+        При равной оценке выше стоит автомобиль с ценой ближе к target_price,
+        а если target_price не задана - более дешевый; затем - стоящий в каталоге раньше.
+        """
+        k = min(k, self.listed)
+        if k <= 0:
+            return []
+        # Оценка считается один раз для каждого профиля, а не для каждого автомобиля
+        profiles = self.groups.profiles()
+        if weights is None:
+            scores = len(ATTRIBUTES) - COMBINATION_DISTANCES[query_combination(inputs)][profiles]
+        else:
+            scores = (COMBINATION_CODES[profiles] == encode_profile(inputs)) @ np.asarray(weights, dtype=float)
+
+        # Группы просматриваются по убыванию оценки, пока не наберется k кандидатов;
+        # группы с той же оценкой, что и последняя нужная, тоже просматриваются
+        candidates, candidate_scores, total, threshold = [], [], 0, None
+        for g in np.argsort(-scores, kind="stable"):
+            if threshold is not None and scores[g] < threshold:
+                break
+            ids = self.groups.nearest(profiles[g], k, target_price)
+            candidates.append(ids)
+            candidate_scores.append(np.full(ids.size, scores[g]))
+            total += ids.size
+            if threshold is None and total >= k:
+                threshold = scores[g]
+
+        ids = np.concatenate(candidates)
+        scores = np.concatenate(candidate_scores)
+        price_key = self.prices[ids] if target_price is None else np.abs(self.prices[ids] - target_price)
+        order = np.lexsort((ids, price_key, -scores))[:k]
+        return [(self.car(ids[i]), scores[i].item()) for i in order]
+
+    def forward_chaining(self, inputs: Sequence, min_matches: int = 5,
+                         by_price: bool = False) -> List[Tuple[CarSpecs, int]]:
+        """Автомобили, у которых совпадает не менее min_matches атрибутов, в порядке каталога
+        (при by_price=True - по возрастанию цены)"""
+        with profiler.stage("forward_chaining"):
+            combination = query_combination(inputs)
+            if min_matches == self.answers.min_matches:
+                # Готовый список из таблицы ответов
+                indices = self.answers.forward[combination]
+            else:
+                # Каждый профиль оценивается один раз, подходящие группы раскрываются
+                indices = np.sort(self.groups.expand(self.groups.matching(combination, min_matches)))
+            if by_price:
+                indices = indices[np.argsort(self.prices[indices], kind="stable")]
+            # Число совпадений считается только для найденных автомобилей
+            matches = len(ATTRIBUTES) - MISMATCH_TABLE[self.packed[indices] ^ COMBINATION_PACKED[combination]]
+            return [(self.car(i), int(m)) for i, m in zip(indices, matches.tolist())]
+
+    def cheapest_match(self, inputs: Sequence) -> Optional[CarSpecs]:
+        """Самый дешевый автомобиль, совпадающий по всем атрибутам"""
+        members = self.groups.members[query_combination(inputs)]
+        return self.car(members[0]) if members.size else None
+
+
+def read_csv(path: str) -> CarCatalog:
+    """Загрузка каталога из CSV с заголовком CATALOG_FIELDS"""
+    with open(path, newline="", encoding="utf-8") as file:
+        return CarCatalog.from_records(csv.DictReader(file))
+
+
+def read_jsonl(path: str) -> CarCatalog:
+    """Загрузка каталога из JSONL, по одному автомобилю в строке"""
+    with open(path, encoding="utf-8") as file:
+        return CarCatalog.from_records(json.loads(line) for line in file if line.strip())
+
+
+def load_catalog(path: str) -> CarCatalog:
+    """Загрузка каталога из снимка (папка), CSV или JSONL файла"""
+    if os.path.isdir(path):
+        return CarCatalog.load_snapshot(path)
+    if path.lower().endswith(".csv"):
+        return read_csv(path)
+    return read_jsonl(path)
+
+
+# Каталог встроенной базы знаний
+catalog = CarCatalog.from_cars(cars)
@@ -0,0 +1,537 @@
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, List, Dict, Tuple, Optional, Sequence
+from dataclasses import dataclass, field
+
+from knowledge_base import Budget, fuzzy_rules, FUZZY_PARAMS, FUZZY_PARAM_SETS, BUDGET_PARAMS, \
+    MEMBERSHIP_FUNCTIONS, make_membership_function
+from profiling import profiler
+
+# Порядок входных параметров (столбцы входной матрицы)
+PARAM_NAMES = ("мощность", "макс. скорость", "клиренс", "объем багажника", "расход топлива", "динамика")
+
+# Порядок уровней бюджета (столбцы матрицы принадлежностей)
+BUDGET_LEVELS = tuple(Budget)
+
+# Бюджет по умолчанию, если все функции принадлежности равны нулю
+DEFAULT_BUDGET = 3500000
+
+# Границы и разрешение сетки бюджета для дефаззификации
+BUDGET_RANGE = (500000, 9000000)
+BUDGET_GRID_SIZE = 1000
+
+FUZZIFICATION_TYPES = tuple(FUZZY_PARAM_SETS)
+
+DEFUZZIFICATION_TYPES = ("center_of_gravity", "mean_of_maximum", "maximum_membership")
+
+# Режимы дефаззификации: по сетке или точно по точкам излома кусочно-линейных функций
+DEFUZZIFICATION_MODES = ("grid", "analytic")
+
+# Относительный допуск, с которым значения агрегированной кривой считаются равными ее максимуму
+MAXIMUM_TOLERANCE = 1e-12
+
+# Типы функций принадлежности бюджета, допускающие точную дефаззификацию
+PIECEWISE_LINEAR_TYPES = ("triangular", "trapezoidal")
+
+# Размер LRU кэша результатов вывода и число знаков после запятой при квантовании входов
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_CACHE_DECIMALS = 2
+
+# Минимальный интервал (секунды) между проверками правил и параметров кэшем вывода; 0 - при каждом запросе
+DEFAULT_CACHE_CHECK_INTERVAL = 0.0
+
+
+def params_signature(params: Dict[str, dict]) -> tuple:
+    """Сигнатура функций принадлежности {термин: {"type", "params"}} для обнаружения изменений"""
+    return tuple((name, spec["type"], tuple(spec["params"])) for name, spec in params.items())
+
+
+def rules_signature(rules: List[dict]) -> tuple:
+    """Сигнатура базы правил для обнаружения изменений"""
+    return tuple((tuple(rule["if"].items()), tuple(rule["then"].items())) for rule in rules)
+
+
+class BudgetCurveCache:
+    """Кэш функций принадлежности бюджета, вычисленных на сетке.
+
+    Кривые хранятся по ключу (уровень бюджета, тип функции, размер сетки) и
+    сбрасываются при любом изменении параметров бюджета.
+    """
+
+    def __init__(self, budget_params: Optional[Dict[str, dict]] = None):
+        self.budget_params = BUDGET_PARAMS if budget_params is None else budget_params
+        self._signature = None
+        self._grids: Dict[int, np.ndarray] = {}
+        self._curves: Dict[Tuple[str, str, int], np.ndarray] = {}
+        self._stacked: Dict[int, np.ndarray] = {}
+        self._breakpoints: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def invalidate(self):
+        """Сброс всех закэшированных кривых"""
+        self._grids.clear()
+        self._curves.clear()
+        self._stacked.clear()
+        self._breakpoints = None
+
+    def _check_signature(self):
+        signature = params_signature(self.budget_params)
+        if signature != self._signature:
+            self.invalidate()
+            self._signature = signature
+
+    def grid(self, grid_size: int = BUDGET_GRID_SIZE) -> np.ndarray:
+        """Сетка значений бюджета заданного размера"""
+        grid = self._grids.get(grid_size)
+        if grid is None:
+            grid = np.linspace(*BUDGET_RANGE, grid_size)
+            grid.setflags(write=False)
+            self._grids[grid_size] = grid
+        return grid
+
+    def curve(self, budget_level: str, grid_size: int = BUDGET_GRID_SIZE) -> np.ndarray:
+        """Функция принадлежности уровня бюджета на сетке"""
+        self._check_signature()
+        spec = self.budget_params[budget_level]
+        key = (budget_level, spec["type"], grid_size)
+        curve = self._curves.get(key)
+        if curve is None:
+            curve = make_membership_function(spec["type"], spec["params"])(self.grid(grid_size))
+            curve.setflags(write=False)
+            self._curves[key] = curve
+        return curve
+
+    def get(self, grid_size: int = BUDGET_GRID_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """Сетка и матрица (5, размер сетки) кривых в порядке BUDGET_LEVELS"""
+        self._check_signature()
+        curves = self._stacked.get(grid_size)
+        if curves is None:
+            curves = np.array([self.curve(level.value, grid_size) for level in BUDGET_LEVELS])
+            curves.setflags(write=False)
+            self._stacked[grid_size] = curves
+        return self.grid(grid_size), curves
+
+    def breakpoints(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Точки излома и матрица (5, число точек) значений кривых в них в порядке BUDGET_LEVELS"""
+        self._check_signature()
+        if self._breakpoints is None:
+            points = {float(bound) for bound in BUDGET_RANGE}
+            for spec in self.budget_params.values():
+                if spec["type"] not in PIECEWISE_LINEAR_TYPES:
+                    raise ValueError(f"Точная дефаззификация не поддерживает функцию типа {spec['type']}")
+                points.update(float(p) for p in spec["params"])
+            x = np.array(sorted(p for p in points if BUDGET_RANGE[0] <= p <= BUDGET_RANGE[1]))
+            values = np.array([
+                make_membership_function(self.budget_params[level.value]["type"],
+                                         self.budget_params[level.value]["params"])(x)
+                for level in BUDGET_LEVELS
+            ])
+            x.setflags(write=False)
+            values.setflags(write=False)
+            self._breakpoints = (x, values)
+        return self._breakpoints
+
+
+# Общий кэш для BUDGET_PARAMS
+budget_curve_cache = BudgetCurveCache()
+
+
+@dataclass
+class CompiledRules:
+    """База правил в виде целочисленной матрицы уровней и вектора консеквентов"""
+    levels: np.ndarray  # (правила, 6) индексы уровней входных параметров
+    consequents: np.ndarray  # (правила,) индексы уровней бюджета в BUDGET_LEVELS
+    antecedents: np.ndarray  # (различные антецеденты, 6) уникальные строки levels
+    antecedent_index: np.ndarray  # (правила,) номер строки в antecedents для каждого правила
+    # Номера исходных правил (с 1), объединенных в каждое правило; пусто, если правила восстановлены из массивов
+    rule_numbers: List[Tuple[int, ...]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.consequents)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Массивы скомпилированных правил; CompiledRules(**arrays) восстанавливает правила"""
+        return {"levels": self.levels, "consequents": self.consequents,
+                "antecedents": self.antecedents, "antecedent_index": self.antecedent_index}
+
+
+def compile_rules(rules: List[dict], fuzzy_params: Optional[Dict[str, dict]] = None) -> CompiledRules:
+    """Компиляция списка правил в целочисленную матрицу с объединением дубликатов"""
+    fuzzy_params = FUZZY_PARAMS if fuzzy_params is None else fuzzy_params
+    level_codes = [{level: k for k, level in enumerate(fuzzy_params[param])} for param in PARAM_NAMES]
+    budget_codes = {level: i for i, level in enumerate(BUDGET_LEVELS)}
+
+    encoded = np.empty((len(rules), len(PARAM_NAMES) + 1), dtype=np.int64)
+    for i, rule in enumerate(rules):
+        conditions = rule["if"]
+        for j, param in enumerate(PARAM_NAMES):
+            encoded[i, j] = level_codes[j][conditions[param]]
+        encoded[i, -1] = budget_codes[rule["then"]["бюджет"]]
+
+    # Одинаковые антецеденты с одинаковым консеквентом дают одно и то же правило
+    unique_rules, first, inverse = np.unique(encoded, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)  # сохраняем порядок первого появления правила
+    unique_rules = unique_rules[order]
+    position = np.empty_like(order)
+    position[order] = np.arange(order.size)
+    merged = [[] for _ in range(order.size)]
+    for i, group in enumerate(position[inverse.ravel()]):
+        merged[group].append(i + 1)
+
+    levels = np.ascontiguousarray(unique_rules[:, :-1], dtype=np.uint8)
+    antecedents, antecedent_index = np.unique(levels, axis=0, return_inverse=True)
+    return CompiledRules(
+        levels=levels,
+        consequents=unique_rules[:, -1].astype(np.uint8),
+        antecedents=antecedents,
+        antecedent_index=antecedent_index.ravel(),
+        rule_numbers=[tuple(numbers) for numbers in merged],
+    )
+
+
+def inputs_to_array(profiles: List[Dict[str, float]]) -> np.ndarray:
+    """Преобразование списка словарей входных параметров в матрицу (N, 6)"""
+    return np.array([[profile[param] for param in PARAM_NAMES] for profile in profiles], dtype=float)
+
+
+class FuzzyEngine:
+    """Пакетный векторизованный нечеткий вывод без зависимости от GUI"""
+
+    def __init__(self, rules: Optional[List[dict]] = None, fuzzy_params: Optional[Dict[str, dict]] = None,
+                 budget_params: Optional[Dict[str, dict]] = None, chunk_size: int = 4096,
+                 grid_size: int = BUDGET_GRID_SIZE, defuzzification_mode: str = "grid",
+                 compiled_rules: Optional[CompiledRules] = None):
+        self.rules = fuzzy_rules if rules is None else rules
+        self.fuzzy_params = FUZZY_PARAMS if fuzzy_params is None else fuzzy_params
+        self.budget_params = BUDGET_PARAMS if budget_params is None else budget_params
+        self.chunk_size = chunk_size
+        self.grid_size = grid_size
+        if defuzzification_mode not in DEFUZZIFICATION_MODES:
+            raise ValueError(f"Неизвестный режим дефаззификации: {defuzzification_mode}")
+        self.defuzzification_mode = defuzzification_mode
+
+        # Уровни каждого входного параметра в порядке объявления в FUZZY_PARAMS
+        self.param_levels = [tuple(self.fuzzy_params[param]) for param in PARAM_NAMES]
+
+        # Функции принадлежности входов группируются по типу: параметры группы хранятся
+        # массивами, и вся группа вычисляется одним векторизованным вызовом
+        groups: Dict[str, list] = {}
+        for j, param in enumerate(PARAM_NAMES):
+            for k, level in enumerate(self.param_levels[j]):
+                spec = self.fuzzy_params[param][level]
+                groups.setdefault(spec["type"], []).append((j, 3 * j + k, spec["params"]))
+        self._fuzzifiers = []
+        for mf_type, members in groups.items():
+            if mf_type not in MEMBERSHIP_FUNCTIONS:
+                continue
+            columns = np.array([column for column, _, _ in members], dtype=np.intp)
+            targets = np.array([target for _, target, _ in members], dtype=np.intp)
+            params = [np.array(values, dtype=float) for values in zip(*(p for _, _, p in members))]
+            self._fuzzifiers.append((MEMBERSHIP_FUNCTIONS[mf_type], columns, targets, params))
+
+        # Правила компилируются один раз: столбцы матрицы фаззификации для каждого антецедента
+        # и списки антецедентов, ведущих к каждому уровню бюджета
+        if compiled_rules is None:
+            compiled_rules = compile_rules(self.rules, self.fuzzy_params)
+        self.compiled_rules = compiled_rules
+        self._antecedent_columns = (self.compiled_rules.antecedents.astype(np.intp)
+                                    + 3 * np.arange(len(PARAM_NAMES)))
+        self._budget_antecedents = [
+            np.unique(self.compiled_rules.antecedent_index[self.compiled_rules.consequents == i])
+            for i in range(len(BUDGET_LEVELS))
+        ]
+
+        # Функции принадлежности бюджета на сетке вычисляются один раз и берутся из кэша
+        if budget_params is None:
+            self.budget_curve_cache = budget_curve_cache
+        else:
+            self.budget_curve_cache = BudgetCurveCache(self.budget_params)
+
+    def fuzzify(self, X: np.ndarray) -> np.ndarray:
+        """Фаззификация: матрица (N, 6, 3) степеней принадлежности"""
+        X = np.asarray(X, dtype=float)
+        mu = np.zeros((X.shape[0], len(PARAM_NAMES) * 3))
+        for function, columns, targets, params in self._fuzzifiers:
+            mu[:, targets] = function(X[:, columns], *params)
+        return mu.reshape(X.shape[0], len(PARAM_NAMES), 3)
+
+    def aggregate(self, mu: np.ndarray) -> np.ndarray:
+        """Агрегация правил: матрица (N, 5) степеней принадлежности уровней бюджета"""
+        strengths = self.rule_strengths(mu)
+        budget_membership = np.zeros((mu.shape[0], len(BUDGET_LEVELS)))
+        for i, antecedents in enumerate(self._budget_antecedents):
+            if antecedents.size:
+                np.maximum(budget_membership[:, i], strengths[:, antecedents].max(axis=1), out=budget_membership[:, i])
+        return budget_membership
+
+    def rule_strengths(self, mu: np.ndarray) -> np.ndarray:
+        """Степени истинности (N, различные антецеденты) как среднее значение активаций"""
+        flat = mu.reshape(mu.shape[0], -1)
+        strengths = flat[:, self._antecedent_columns[:, 0]]
+        for j in range(1, len(PARAM_NAMES)):
+            strengths += flat[:, self._antecedent_columns[:, j]]
+        return strengths / len(PARAM_NAMES)
+
+    def defuzzify(self, budget_membership: np.ndarray, defuzzification_type: str = "center_of_gravity") -> np.ndarray:
+        """Дефаззификация: вектор (N,) бюджетов"""
+        x, curves = self.budget_curve_cache.get(self.grid_size)
+        # Агрегированные кривые всех профилей одним умножением (N, 5) x (5, размер сетки)
+        y = budget_membership @ curves
+        total = y.sum(axis=1)
+        empty = total == 0
+
+        if defuzzification_type == "center_of_gravity":
+            budgets = (y @ x) / np.where(empty, 1.0, total)
+        else:
+            # Порядок суммирования в умножении матриц не фиксирован, поэтому равные максимумы
+            # сравниваются с относительным допуском, как в defuzzify_analytic
+            is_max = y >= y.max(axis=1, keepdims=True) * (1 - MAXIMUM_TOLERANCE)
+            if defuzzification_type == "mean_of_maximum":
+                budgets = (is_max @ x) / is_max.sum(axis=1)
+            else:  # maximum_membership
+                budgets = x[np.argmax(is_max, axis=1)]
+
+        return np.where(empty, DEFAULT_BUDGET, budgets)
+
+    def defuzzify_analytic(self, budget_membership: np.ndarray,
+                           defuzzification_type: str = "center_of_gravity") -> np.ndarray:
+        """Точная дефаззификация для треугольных и трапециевидных функций бюджета.
+
+        Агрегированная кривая кусочно-линейна, поэтому центр тяжести и множество
+        максимумов вычисляются по ее значениям в точках излома без сетки.
+        """
+        x, values = self.budget_curve_cache.breakpoints()
+        y = budget_membership @ values
+        x0, x1 = x[:-1], x[1:]
+        y0, y1 = y[:, :-1], y[:, 1:]
+        h = x1 - x0
+        area = (y0 + y1) @ h / 2
+        empty = area <= 0
+
+        if defuzzification_type == "center_of_gravity":
+            moment = (y0 * (2 * x0 + x1) + y1 * (x0 + 2 * x1)) @ h / 6
+            budgets = moment / np.where(empty, 1.0, area)
+        else:
+            y_max = y.max(axis=1, keepdims=True)
+            is_max = y >= y_max * (1 - MAXIMUM_TOLERANCE)
+            if defuzzification_type == "mean_of_maximum":
+                # Центр отрезков плато максимума; если плато нет - среднее изолированных точек максимума
+                plateau = (is_max[:, :-1] & is_max[:, 1:]) * h
+                plateau_length = plateau.sum(axis=1)
+                plateau_center = (plateau @ ((x0 + x1) / 2)) / np.where(plateau_length > 0, plateau_length, 1.0)
+                points_center = (is_max @ x) / is_max.sum(axis=1)
+                budgets = np.where(plateau_length > 0, plateau_center, points_center)
+            else:  # maximum_membership
+                budgets = x[np.argmax(is_max, axis=1)]
+
+        return np.where(empty, DEFAULT_BUDGET, budgets)
+
+    def infer(self, X: np.ndarray, defuzzification_type: str = "center_of_gravity") -> Tuple[np.ndarray, np.ndarray]:
+        """Нечеткий вывод для матрицы входных профилей (N, 6).
+
+        Возвращает матрицу (N, 5) принадлежностей уровней бюджета в порядке BUDGET_LEVELS
+        и вектор (N,) бюджетов после дефаззификации.
+        """
+        with profiler.stage("fuzzy_inference"):
+            X = np.atleast_2d(np.asarray(X, dtype=float))
+            n = X.shape[0]
+            budget_membership = np.empty((n, len(BUDGET_LEVELS)))
+            budgets = np.empty(n)
+
+            # Обработка частями, чтобы ограничить размер матрицы (N, размер сетки)
+            for start in range(0, n, self.chunk_size):
+                stop = min(start + self.chunk_size, n)
+                with profiler.stage("fuzzification"):
+                    mu = self.fuzzify(X[start:stop])
+                with profiler.stage("rule_aggregation"):
+                    membership = self.aggregate(mu)
+                budget_membership[start:stop] = membership
+                with profiler.stage("defuzzification"):
+                    if self.defuzzification_mode == "analytic":
+                        budgets[start:stop] = self.defuzzify_analytic(membership, defuzzification_type)
+                    else:
+                        budgets[start:stop] = self.defuzzify(membership, defuzzification_type)
+
+        return budget_membership, budgets
+
+    def infer_one(self, inputs: Dict[str, float], defuzzification_type: str = "center_of_gravity") -> \
+            Tuple[Dict[Budget, float], float]:
+        """Нечеткий вывод для одного словаря входных параметров"""
+        budget_membership, budgets = self.infer(inputs_to_array([inputs]), defuzzification_type)
+        return dict(zip(BUDGET_LEVELS, budget_membership[0].tolist())), float(budgets[0])
+
+
+class FuzzyParamRegistry:
+    """Наборы параметров функций принадлежности по типам фаззификации.
+
+    Для каждого набора при загрузке заранее создаются функции принадлежности
+    и движок вывода, поэтому смена типа фаззификации не требует перекомпиляции.
+    refresh() сверяет сигнатуру правил и параметров с собранной и при изменении
+    перестраивает движки; номер версии, по которому сбрасываются кэши, увеличивается.
+    """
+
+    def __init__(self, param_sets: Optional[Dict[str, Dict[str, dict]]] = None, rules: Optional[List[dict]] = None,
+                 budget_params: Optional[Dict[str, dict]] = None, **engine_options):
+        self.param_sets = FUZZY_PARAM_SETS if param_sets is None else param_sets
+        self.rules = rules
+        self.budget_params = budget_params
+        self.engine_options = engine_options
+        self.version = 0
+        self.lock = threading.Lock()
+        self._build()
+
+    def signature(self) -> tuple:
+        """Сигнатура текущих правил и параметров всех наборов и бюджета"""
+        rules = fuzzy_rules if self.rules is None else self.rules
+        budget_params = BUDGET_PARAMS if self.budget_params is None else self.budget_params
+        return (rules_signature(rules), params_signature(budget_params),
+                tuple((fuzzification_type, param, params_signature(levels))
+                      for fuzzification_type, params in self.param_sets.items() for param, levels in params.items()))
+
+    def _build(self):
+        self._signature = self.signature()
+        self.evaluators = {
+            fuzzification_type: {param: {level: _evaluator(spec) for level, spec in levels.items()}
+                                 for param, levels in params.items()}
+            for fuzzification_type, params in self.param_sets.items()
+        }
+        self.engines = {
+            fuzzification_type: FuzzyEngine(self.rules, params, self.budget_params, **self.engine_options)
+            for fuzzification_type, params in self.param_sets.items()
+        }
+
+    def reload(self):
+        """Перестроение функций принадлежности и движков по текущим правилам и параметрам"""
+        with self.lock:
+            self._build()
+            self.version += 1
+
+    def refresh(self) -> bool:
+        """Перестроение, если правила или параметры изменились после последней сборки"""
+        if self.signature() == self._signature:
+            return False
+        with self.lock:
+            if self.signature() != self._signature:
+                self._build()
+                self.version += 1
+        return True
+
+    def _check_type(self, fuzzification_type: str):
+        if fuzzification_type not in self.param_sets:
+            raise ValueError(f"Неизвестный тип фаззификации: {fuzzification_type}")
+
+    def evaluator(self, fuzzification_type: str, param: str, level: str):
+        """Функция принадлежности термина для заданного типа фаззификации.
+
+        Параметры термина сверяются с текущими, и при их изменении функция создается заново.
+        """
+        self._check_type(fuzzification_type)
+        spec = self.param_sets[fuzzification_type][param][level]
+        levels = self.evaluators[fuzzification_type].setdefault(param, {})
+        cached = levels.get(level)
+        if cached is None or cached[0] != (spec["type"], tuple(spec["params"])):
+            cached = levels[level] = _evaluator(spec)
+        return cached[1]
+
+    def engine(self, fuzzification_type: str = "triangular") -> FuzzyEngine:
+        """Движок вывода для заданного типа фаззификации"""
+        self._check_type(fuzzification_type)
+        return self.engines[fuzzification_type]
+
+    def infer(self, X: np.ndarray, fuzzification_type: str = "triangular",
+              defuzzification_type: str = "center_of_gravity") -> Tuple[np.ndarray, np.ndarray]:
+        """Нечеткий вывод для матрицы (N, 6) с выбранным типом фаззификации"""
+        self.refresh()
+        return self.engine(fuzzification_type).infer(X, defuzzification_type)
+
+
+def _evaluator(spec: dict) -> tuple:
+    """Параметры термина и построенная по ним функция принадлежности"""
+    return (spec["type"], tuple(spec["params"])), make_membership_function(spec["type"], spec["params"])
+
+
+# Общий реестр наборов FUZZY_PARAM_SETS
+fuzzy_registry = FuzzyParamRegistry()
+
+
+class FuzzyInferenceCache:
+    """LRU кэш результатов нечеткого вывода.
+
+    Ключ - входные значения, округленные до decimals знаков после запятой, и типы
+    фаззификации и дефаззификации. Вывод выполняется для округленных значений, поэтому
+    результат зависит только от ключа. Перед выдачей ключа реестр проверяет, не изменились
+    ли fuzzy_rules, наборы FUZZY_PARAMS или BUDGET_PARAMS (не чаще раза в check_interval
+    секунд), и при изменении перестраивает движки; кэш, увидев новую версию реестра,
+    сбрасывается. invalidate() сбрасывает кэш явно.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, decimals: int = DEFAULT_CACHE_DECIMALS,
+                 registry: Optional[FuzzyParamRegistry] = None,
+                 check_interval: float = DEFAULT_CACHE_CHECK_INTERVAL):
+        self.maxsize = maxsize
+        self.scale = 10 ** decimals
+        self.registry = fuzzy_registry if registry is None else registry
+        self.check_interval = check_interval
+        self._checked = time.monotonic()
+        self._version = self.registry.version
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def invalidate(self):
+        """Сброс всех закэшированных результатов"""
+        self._entries.clear()
+        self.invalidations += 1
+
+    def key(self, values: Sequence[float], fuzzification_type: str, defuzzification_type: str) -> tuple:
+        """Ключ кэша; заодно сбрасывает кэш, если правила или параметры изменились"""
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            self.registry.refresh()
+        if self.registry.version != self._version:
+            self._version = self.registry.version
+            self.invalidate()
+        return tuple(round(x * self.scale) for x in values), fuzzification_type, defuzzification_type
+
+    def values(self, key: tuple) -> List[float]:
+        """Округленные входные значения, для которых выполняется вывод"""
+        return [q / self.scale for q in key[0]]
+
+    def lookup(self, key: tuple) -> Optional[Any]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return result
+
+    def store(self, key: tuple, result: Any):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, values: Sequence[float], fuzzification_type: str, defuzzification_type: str,
+            compute: Callable[[List[float]], Any]) -> Any:
+        """Результат из кэша или compute(округленные значения) с сохранением в кэш"""
+        key = self.key(values, fuzzification_type, defuzzification_type)
+        result = self.lookup(key)
+        if result is None:
+            result = compute(self.values(key))
+            self.store(key, result)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / requests, 4) if requests else 0.0}
@@ -0,0 +1,599 @@
+import numpy as np
+from functools import lru_cache
+from typing import Callable, Sequence
+from dataclasses import dataclass
+from enum import Enum
+
+class Power(Enum):
+    HIGH = "высокая"
+    MEDIUM = "средняя"
+    LOW = "низкая"
+
+class MaxSpeed(Enum):
+    HIGH = "высокая"
+    MEDIUM = "средняя"
+    LOW = "низкая"
+
+class Clearance(Enum):
+    BIG = "большой"
+    MEDIUM = "средний"
+    SMALL = "маленький"
+
+class TrunkVolume(Enum):
+    BIG = "большой"
+    MEDIUM = "средний"
+    SMALL = "маленький"
+
+class FuelConsumption(Enum):
+    BIG = "большой"
+    MEDIUM = "средний"
+    SMALL = "маленький"
+
+class Dynamics(Enum):
+    HIGH = "высокая"
+    MEDIUM = "средняя"
+    LOW = "низкая"
+
+class Budget(Enum):
+    VERY_HIGH = "очень высокий"
+    HIGH = "высокий"
+    MEDIUM = "средний"
+    LOW = "низкий"
+    VERY_LOW = "очень низкий"
+
+# Data structure for car specifications
+@dataclass
+class CarSpecs:
+    name: str
+    power: Power
+    max_speed: MaxSpeed
+    clearance: Clearance
+    trunk_volume: TrunkVolume
+    fuel_consumption: FuelConsumption
+    dynamics: Dynamics
+    price: int
+
+# Fuzzy membership functions
+def triangular(x: float, a: float, b: float, c: float) -> float:
+    if x <= a or x >= c:
+        return 0.0
+    elif a <= x <= b:
+        return (x - a) / (b - a)
+    else:
+        return (c - x) / (c - b)
+
+def trapezoidal(x: float, a: float, b: float, c: float, d: float) -> float:
+    if x <= a or x >= d:
+        return 0.0
+    elif b <= x <= c:
+        return 1.0
+    elif a <= x <= b:
+        return (x - a) / (b - a)
+    else:
+        return (d - x) / (d - c)
+
+def gaussian(x: float, c: float, sigma: float) -> float:
+    return np.exp(-((x - c) ** 2) / (2 * sigma ** 2))
+
+def generalized_gaussian(x: float, c: float, sigma: float, p: float) -> float:
+    return np.exp(-(abs(x - c) ** p) / (2 * sigma ** p))
+
+# Vectorized membership functions: x and parameters are broadcast against each other
+def triangular_array(x, a, b, c):
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.where(x <= b, (x - a) / (b - a), (c - x) / (c - b))
+    return np.where((x <= a) | (x >= c), 0.0, y)[()]
+
+def trapezoidal_array(x, a, b, c, d):
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.where(x <= b, (x - a) / (b - a), (d - x) / (d - c))
+    y = np.where((b <= x) & (x <= c), 1.0, y)
+    return np.where((x <= a) | (x >= d), 0.0, y)[()]
+
+def gaussian_array(x, c, sigma):
+    x = np.asarray(x, dtype=float)
+    return np.exp(-((x - c) ** 2) / (2 * np.asarray(sigma, dtype=float) ** 2))[()]
+
+def generalized_gaussian_array(x, c, sigma, p):
+    x = np.asarray(x, dtype=float)
+    return np.exp(-(np.abs(x - c) ** p) / (2 * np.asarray(sigma, dtype=float) ** p))[()]
+
+MEMBERSHIP_FUNCTIONS = {
+    "triangular": triangular_array,
+    "trapezoidal": trapezoidal_array,
+    "gaussian": gaussian_array,
+    "generalized_gaussian": generalized_gaussian_array
+}
+
+@lru_cache(maxsize=None)
+def _resolve_membership(mf_type: str, params: tuple) -> Callable:
+    function = MEMBERSHIP_FUNCTIONS.get(mf_type)
+    if function is None:
+        return lambda x: np.zeros_like(np.asarray(x, dtype=float))[()]
+    return lambda x: function(x, *params)
+
+def make_membership_function(mf_type: str, params: Sequence[float]) -> Callable:
+    """Функция принадлежности с привязанными параметрами для массивов любой формы"""
+    return _resolve_membership(mf_type, tuple(float(p) for p in params))
+
+# Defuzzification methods
+def center_of_gravity(x: np.ndarray, y: np.ndarray) -> float:
+    return np.sum(x * y) / np.sum(y)
+
+def mean_of_maximum(x: np.ndarray, y: np.ndarray) -> float:
+    max_y = np.max(y)
+    max_indices = np.where(y == max_y)[0]
+    return np.mean(x[max_indices])
+
+def maximum_membership(x: np.ndarray, y: np.ndarray) -> float:
+    return x[np.argmax(y)]
+
+# Car database
+cars = [
+    CarSpecs("Lada Granta", Power.LOW, MaxSpeed.LOW, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.SMALL, Dynamics.LOW, 800000),
+    CarSpecs("Lada Vesta", Power.LOW, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.LOW, 1200000),
+    CarSpecs("Kia Rio", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1500000),
+    CarSpecs("Hyundai Solaris", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1400000),
+    CarSpecs("Volkswagen Polo", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1600000),
+    CarSpecs("Skoda Rapid", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.BIG, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1700000),
+    CarSpecs("Toyota Camry", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 2500000),
+    CarSpecs("Nissan X-Trail", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 2800000),
+    CarSpecs("Mitsubishi Outlander", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 2600000),
+    CarSpecs("Honda CR-V", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 3000000),
+    CarSpecs("Mazda CX-5", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.MEDIUM, Dynamics.HIGH, 2900000),
+    CarSpecs("Subaru Forester", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 2700000),
+    CarSpecs("Volkswagen Tiguan", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.HIGH, 3200000),
+    CarSpecs("Skoda Kodiaq", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 3100000),
+    CarSpecs("Audi Q5", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 4500000),
+    CarSpecs("BMW X3", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 4800000),
+    CarSpecs("Mercedes-Benz GLC", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 5000000),
+    CarSpecs("Lexus RX", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 5500000),
+    CarSpecs("Porsche Cayenne", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 8000000),
+    CarSpecs("Range Rover Sport", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 9000000),
+    CarSpecs("Lada Niva", Power.LOW, MaxSpeed.LOW, Clearance.BIG, TrunkVolume.SMALL, FuelConsumption.MEDIUM, Dynamics.LOW, 1000000),
+    CarSpecs("UAZ Patriot", Power.LOW, MaxSpeed.LOW, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.LOW, 1500000),
+    CarSpecs("Renault Duster", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1800000),
+    CarSpecs("Suzuki Vitara", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1900000),
+    CarSpecs("Toyota RAV4", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.HIGH, 3500000),
+    CarSpecs("Kia Sportage", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 2200000),
+    CarSpecs("Hyundai Tucson", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 2300000),
+    CarSpecs("Ford Explorer", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 4000000),
+    CarSpecs("Jeep Grand Cherokee", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 4200000),
+    CarSpecs("Volvo XC90", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 6000000)
+]
+
+# Fuzzy rules database (30 rules)
+fuzzy_rules = [
+    # Rule 1: Если все параметры низкие -> очень низкий бюджет
+    {
+        "if": {
+            "мощность": "низкая",
+            "макс. скорость": "низкая",
+            "клиренс": "маленький",
+            "объем багажника": "маленький",
+            "расход топлива": "маленький",
+            "динамика": "низкая"
+        },
+        "then": {"бюджет": Budget.VERY_LOW}
+    },
+    # Rule 2: Если большинство параметров низкие, но есть средние -> низкий бюджет
+    {
+        "if": {
+            "мощность": "низкая",
+            "макс. скорость": "средняя",
+            "клиренс": "маленький",
+            "объем багажника": "маленький",
+            "расход топлива": "маленький",
+            "динамика": "низкая"
+        },
+        "then": {"бюджет": Budget.LOW}
+    },
+    # Rule 3: Если половина параметров низкие, половина средние -> низкий бюджет
+    {
+        "if": {
+            "мощность": "низкая",
+            "макс. скорость": "средняя",
+            "клиренс": "маленький",
+            "объем багажника": "средний",
+            "расход топлива": "маленький",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.LOW}
+    },
+    # Rule 4: Если большинство параметров средние, есть низкие -> низкий бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "маленький",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.LOW}
+    },
+    # Rule 5: Если все параметры средние -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 6: Если большинство параметров средние, есть высокие -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "высокая",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 7: Если половина параметров средние, половина высокие -> средний бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 8: Если большинство параметров высокие, есть средние -> высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "средний",
+            "объем багажника": "большой",
+            "расход топлива": "большой",
+            "динамика": "высокая"
+        },
+        "then": {"бюджет": Budget.HIGH}
+    },
+    # Rule 9: Если все параметры высокие -> очень высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "большой",
+            "объем багажника": "большой",
+            "расход топлива": "большой",
+            "динамика": "высокая"
+        },
+        "then": {"бюджет": Budget.VERY_HIGH}
+    },
+    # Rule 10: Если мощность высокая, остальные средние -> средний бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 11: Если динамика высокая, остальные средние -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "высокая"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 12: Если клиренс большой, остальные средние -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "большой",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 13: Если объем багажника большой, остальные средние -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "большой",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 14: Если расход топлива большой, остальные средние -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "большой",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 15: Если мощность и динамика высокие, остальные средние -> высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "высокая"
+        },
+        "then": {"бюджет": Budget.HIGH}
+    },
+    # Rule 16: Если мощность и скорость высокие, остальные средние -> высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.HIGH}
+    },
+    # Rule 17: Если мощность и клиренс высокие, остальные средние -> высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "средняя",
+            "клиренс": "большой",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.HIGH}
+    },
+    # Rule 18: Если мощность и багажник высокие, остальные средние -> высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "большой",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.HIGH}
+    },
+    # Rule 19: Если мощность и расход высокие, остальные средние -> высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "большой",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.HIGH}
+    },
+    # Rule 20: Если три параметра высокие, три средние -> высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "большой",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.HIGH}
+    },
+    # Rule 21: Если четыре параметра высокие, два средние -> очень высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "большой",
+            "объем багажника": "большой",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.VERY_HIGH}
+    },
+    # Rule 22: Если пять параметров высокие, один средний -> очень высокий бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "большой",
+            "объем багажника": "большой",
+            "расход топлива": "большой",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.VERY_HIGH}
+    },
+    # Rule 23: Если два параметра низкие, четыре средние -> низкий бюджет
+    {
+        "if": {
+            "мощность": "низкая",
+            "макс. скорость": "низкая",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.LOW}
+    },
+    # Rule 24: Если три параметра низкие, три средние -> низкий бюджет
+    {
+        "if": {
+            "мощность": "низкая",
+            "макс. скорость": "низкая",
+            "клиренс": "маленький",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.LOW}
+    },
+    # Rule 25: Если четыре параметра низкие, два средние -> очень низкий бюджет
+    {
+        "if": {
+            "мощность": "низкая",
+            "макс. скорость": "низкая",
+            "клиренс": "маленький",
+            "объем багажника": "маленький",
+            "расход топлива": "средний",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.VERY_LOW}
+    },
+    # Rule 26: Если пять параметров низкие, один средний -> очень низкий бюджет
+    {
+        "if": {
+            "мощность": "низкая",
+            "макс. скорость": "низкая",
+            "клиренс": "маленький",
+            "объем багажника": "маленький",
+            "расход топлива": "маленький",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.VERY_LOW}
+    },
+    # Rule 27: Если все параметры средние, кроме одного высокого -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "средний",
+            "динамика": "высокая"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 28: Если все параметры средние, кроме одного низкого -> средний бюджет
+    {
+        "if": {
+            "мощность": "средняя",
+            "макс. скорость": "средняя",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "маленький",
+            "динамика": "средняя"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 29: Если два параметра высокие, два средние, два низкие -> средний бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "средний",
+            "объем багажника": "средний",
+            "расход топлива": "маленький",
+            "динамика": "низкая"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    },
+    # Rule 30: Если три параметра высокие, три низкие -> средний бюджет
+    {
+        "if": {
+            "мощность": "высокая",
+            "макс. скорость": "высокая",
+            "клиренс": "большой",
+            "объем багажника": "маленький",
+            "расход топлива": "маленький",
+            "динамика": "низкая"
+        },
+        "then": {"бюджет": Budget.MEDIUM}
+    }
+]
+
+# Fuzzy membership function parameters
+FUZZY_PARAMS = {
+    "мощность": {
+        "низкая": {"type": "triangular", "params": [1, 3, 5]},
+        "средняя": {"type": "triangular", "params": [3, 5, 7]},
+        "высокая": {"type": "triangular", "params": [5, 7, 10]}
+    },
+    "макс. скорость": {
+        "низкая": {"type": "triangular", "params": [1, 3, 5]},
+        "средняя": {"type": "triangular", "params": [3, 5, 7]},
+        "высокая": {"type": "triangular", "params": [5, 7, 10]}
+    },
+    "клиренс": {
+        "маленький": {"type": "triangular", "params": [1, 3, 5]},
+        "средний": {"type": "triangular", "params": [3, 5, 7]},
+        "большой": {"type": "triangular", "params": [5, 7, 10]}
+    },
+    "объем багажника": {
+        "маленький": {"type": "triangular", "params": [1, 3, 5]},
+        "средний": {"type": "triangular", "params": [3, 5, 7]},
+        "большой": {"type": "triangular", "params": [5, 7, 10]}
+    },
+    "расход топлива": {
+        "маленький": {"type": "triangular", "params": [1, 3, 5]},
+        "средний": {"type": "triangular", "params": [3, 5, 7]},
+        "большой": {"type": "triangular", "params": [5, 7, 10]}
+    },
+    "динамика": {
+        "низкая": {"type": "triangular", "params": [1, 3, 5]},
+        "средняя": {"type": "triangular", "params": [3, 5, 7]},
+        "высокая": {"type": "triangular", "params": [5, 7, 10]}
+    }
+}
+
+def _param_set(mf_type: str, low: list, medium: list, high: list) -> dict:
+    """Одинаковые параметры терминов для всех входных переменных"""
+    levels = {
+        "мощность": ("низкая", "средняя", "высокая"),
+        "макс. скорость": ("низкая", "средняя", "высокая"),
+        "клиренс": ("маленький", "средний", "большой"),
+        "объем багажника": ("маленький", "средний", "большой"),
+        "расход топлива": ("маленький", "средний", "большой"),
+        "динамика": ("низкая", "средняя", "высокая")
+    }
+    return {
+        param: {
+            names[0]: {"type": mf_type, "params": list(low)},
+            names[1]: {"type": mf_type, "params": list(medium)},
+            names[2]: {"type": mf_type, "params": list(high)}
+        }
+        for param, names in levels.items()
+    }
+
+# Membership function parameter sets for every fuzzification type
+FUZZY_PARAM_SETS = {
+    "triangular": FUZZY_PARAMS,
+    "trapezoidal": _param_set("trapezoidal", [0, 1, 3, 5], [3, 4.5, 5.5, 7], [5, 7, 10, 11]),
+    "gaussian": _param_set("gaussian", [1, 1.5], [5.5, 1.5], [10, 1.5]),
+    "generalized_gaussian": _param_set("generalized_gaussian", [1, 2, 4], [5.5, 1.5, 4], [10, 2, 4])
+}
+
+# Budget membership function parameters
+BUDGET_PARAMS = {
+    "очень низкий": {"type": "triangular", "params": [500000, 1000000, 2000000]},
+    "низкий": {"type": "triangular", "params": [1000000, 2000000, 3000000]},
+    "средний": {"type": "triangular", "params": [2000000, 3500000, 5000000]},
+    "высокий": {"type": "triangular", "params": [3000000, 5000000, 7000000]},
+    "очень высокий": {"type": "triangular", "params": [5000000, 7000000, 9000000]}
+}
@@ -0,0 +1,251 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+
+from catalog import ATTRIBUTES, CarCatalog, car_profile, combination_index, level_code, pack_codes, \
+    _price_position
+from knowledge_base import CarSpecs
+from profiling import profiler
+
+# Поля, которые можно изменить у автомобиля каталога
+EDITABLE_FIELDS = ("name",) + ATTRIBUTES + ("price",)
+
+
+def _price(value) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"недопустимая цена: {value!r}") from None
+
+
+class CatalogEditor:
+    """Черновик изменений каталога: добавление, изменение и снятие с продажи автомобилей.
+
+    Изменения копятся по строкам и применяются в commit(), который строит новый каталог
+    из исходного. Копируются только массивы с измененными строками и списки индексов,
+    в которые попали затронутые автомобили; остальное разделяется с исходным каталогом.
+    """
+
+    def __init__(self, base: CarCatalog):
+        self.base = base
+        self.changes: Dict[int, dict] = {}
+        self.added: List[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.added)
+
+    def _row(self, car_id: int) -> dict:
+        """Изменяемые поля автомобиля car_id в черновике"""
+        car_id = int(car_id)
+        if not 0 <= car_id < len(self):
+            raise ValueError(f"нет автомобиля с номером {car_id}")
+        if car_id >= len(self.base):
+            return self.added[car_id - len(self.base)]
+        row = self.changes.get(car_id)
+        if row is None:
+            if not self.base.active[car_id]:
+                raise ValueError(f"автомобиль {car_id} снят с продажи")
+            row = self.changes[car_id] = {}
+        return row
+
+    def add(self, car: Union[CarSpecs, dict]) -> int:
+        """Добавление автомобиля (CarSpecs или словарь с полями CATALOG_FIELDS); возвращает его номер"""
+        if isinstance(car, CarSpecs):
+            car = {"name": car.name, "price": car.price, **dict(zip(ATTRIBUTES, car_profile(car)))}
+        self.added.append({"codes": tuple(level_code(j, car[attribute]) for j, attribute in enumerate(ATTRIBUTES)),
+                           "price": _price(car["price"]), "name": str(car["name"]), "active": True})
+        return len(self) - 1
+
+    def update(self, car_id: int, **fields):
+        """Изменение полей EDITABLE_FIELDS автомобиля car_id"""
+        unknown = set(fields) - set(EDITABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"неизвестные поля: {', '.join(sorted(unknown))}")
+        row = self._row(car_id)
+        if row.get("active") is False:
+            raise ValueError(f"автомобиль {car_id} снят с продажи")
+        if any(attribute in fields for attribute in ATTRIBUTES):
+            codes = list(row["codes"] if "codes" in row else self.base.codes[car_id])
+            for j, attribute in enumerate(ATTRIBUTES):
+                if attribute in fields:
+                    codes[j] = level_code(j, fields[attribute])
+            row["codes"] = tuple(codes)
+        if "price" in fields:
+            row["price"] = _price(fields["price"])
+        if "name" in fields:
+            row["name"] = str(fields["name"])
+
+    def delist(self, car_id: int):
+        """Снятие автомобиля car_id с продажи: он исключается из всех индексов, номер не переиспользуется"""
+        row = self._row(car_id)
+        if row.get("active") is False:
+            raise ValueError(f"автомобиль {car_id} снят с продажи")
+        row["active"] = False
+
+    def commit(self) -> CarCatalog:
+        """Новый каталог с примененными изменениями; исходный каталог не меняется"""
+        base = self.base
+        if not self.changes and not self.added:
+            return base
+        with profiler.stage("catalog_commit"):
+            n = len(base)
+            rows = dict(self.changes)
+            rows.update((n + i, row) for i, row in enumerate(self.added))
+            ids = np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+            # Строки: массив копируется, только если у него есть измененные или новые строки
+            codes = self._column(base.codes, rows, "codes", np.uint8)
+            prices = self._column(base.prices, rows, "price", np.int64)
+            active = self._column(base.active, rows, "active", bool)
+            packed = base.packed if codes is base.codes else self._packed(codes, rows)
+            name_offsets, name_data = self._names(rows)
+
+            # Состояние затронутых автомобилей до и после изменений
+            old_listed = np.zeros(ids.size, dtype=bool)
+            existing = ids < n
+            old_listed[existing] = base.active[ids[existing]]
+            new_listed = active[ids]
+            old_codes = base.codes[np.minimum(ids, n - 1)] if n else codes[ids]
+            old_prices = np.where(existing, base.prices[np.minimum(ids, n - 1)], 0) if n else prices[ids]
+            new_codes, new_prices = codes[ids], prices[ids]
+            old_combinations = combination_index(old_codes)
+            new_combinations = combination_index(new_codes)
+
+            price_order, sorted_prices = self._price_index(ids, old_listed, old_prices, new_listed, new_prices)
+            answers = base.answers.copy()
+            groups = base.groups.copy()
+            for i, car_id in enumerate(ids.tolist()):
+                same_profile = old_combinations[i] == new_combinations[i]
+                if old_listed[i] and not (new_listed[i] and same_profile):
+                    answers.remove(car_id, int(old_combinations[i]))
+                if new_listed[i] and not (old_listed[i] and same_profile):
+                    answers.add(car_id, int(new_combinations[i]))
+                if old_listed[i] == new_listed[i] and same_profile and old_prices[i] == new_prices[i]:
+                    continue
+                if old_listed[i]:
+                    groups.remove(car_id, int(old_combinations[i]), int(old_prices[i]))
+                if new_listed[i]:
+                    groups.add(car_id, int(new_combinations[i]), int(new_prices[i]))
+
+            listed = base.listed + int(np.count_nonzero(new_listed)) - int(np.count_nonzero(old_listed))
+            return CarCatalog.from_parts(codes, prices, name_offsets, name_data, active, listed, packed,
+                                         price_order, sorted_prices, answers, groups)
+
+    def _column(self, values: np.ndarray, rows: Dict[int, dict], field: str, dtype) -> np.ndarray:
+        changed = [(car_id, row[field]) for car_id, row in rows.items() if field in row and car_id < len(values)]
+        added = [row[field] for row in self.added]
+        if not changed and not added:
+            return values
+        shape = (len(values) + len(added),) + values.shape[1:]
+        column = np.empty(shape, dtype=dtype)
+        column[:len(values)] = values
+        if added:
+            column[len(values):] = added
+        for car_id, value in changed:
+            column[car_id] = value
+        return column
+
+    def _packed(self, codes: np.ndarray, rows: Dict[int, dict]) -> np.ndarray:
+        n = len(self.base)
+        packed = np.empty(len(codes), dtype=np.uint16)
+        packed[:n] = self.base.packed
+        changed = np.array([car_id for car_id, row in rows.items() if "codes" in row or car_id >= n], dtype=np.int64)
+        packed[changed] = pack_codes(codes[changed])
+        return packed
+
+    def _names(self, rows: Dict[int, dict]):
+        """Смещения и буфер названий: новые названия дописываются в конец, измененные - заменяются"""
+        base = self.base
+        renamed = sorted(car_id for car_id, row in self.changes.items() if "name" in row)
+        if not renamed and not self.added:
+            return base.name_offsets, base.name_data
+        name_offsets, name_data = base.name_offsets, base.name_data
+        if renamed:
+            # Буфер собирается из кусков между переименованными автомобилями
+            pieces, lengths, start = [], np.diff(base.name_offsets), 0
+            for car_id in renamed:
+                encoded = rows[car_id]["name"].encode("utf-8")
+                pieces.append(base.name_data[base.name_offsets[start]:base.name_offsets[car_id]])
+                pieces.append(np.frombuffer(encoded, dtype=np.uint8))
+                lengths[car_id] = len(encoded)
+                start = car_id + 1
+            pieces.append(base.name_data[base.name_offsets[start]:])
+            name_data = np.concatenate(pieces)
+            name_offsets = np.zeros(len(base) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=name_offsets[1:])
+        if self.added:
+            encoded = [row["name"].encode("utf-8") for row in self.added]
+            lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+            name_offsets = np.concatenate([name_offsets, name_offsets[-1] + np.cumsum(lengths)])
+            name_data = np.concatenate([name_data, np.frombuffer(b"".join(encoded), dtype=np.uint8)])
+        return name_offsets, name_data
+
+    def _price_index(self, ids: np.ndarray, old_listed: np.ndarray, old_prices: np.ndarray,
+                     new_listed: np.ndarray, new_prices: np.ndarray):
+        """Индекс по цене, упорядоченный по (цена, номер), с удалением старых и вставкой новых позиций"""
+        price_order, sorted_prices = self.base.price_order, self.base.sorted_prices
+        moved = old_listed & new_listed & (old_prices != new_prices)
+        removed = old_listed & (~new_listed | moved)
+        inserted = new_listed & (~old_listed | moved)
+        if removed.any():
+            positions = [_price_position(price_order, sorted_prices, car_id, price)
+                         for car_id, price in zip(ids[removed].tolist(), old_prices[removed].tolist())]
+            price_order = np.delete(price_order, positions)
+            sorted_prices = np.delete(sorted_prices, positions)
+        if inserted.any():
+            order = np.lexsort((ids[inserted], new_prices[inserted]))
+            inserted_ids, inserted_prices = ids[inserted][order], new_prices[inserted][order]
+            positions = [_price_position(price_order, sorted_prices, car_id, price)
+                         for car_id, price in zip(inserted_ids.tolist(), inserted_prices.tolist())]
+            price_order = np.insert(price_order, positions, inserted_ids)
+            sorted_prices = np.insert(sorted_prices, positions, inserted_prices)
+        return price_order, sorted_prices
+
+
+class LiveCatalog:
+    """Каталог, изменяемый во время обслуживания запросов.
+
+    Читатели берут текущий снимок через snapshot() и работают с ним до конца запроса:
+    снимки неизменяемы, а каждое изменение публикует новый снимок, разделяющий с
+    предыдущим все нетронутые массивы и списки индексов (копирование при записи).
+    Изменения выполняются по одному под блокировкой; чтение блокировок не требует.
+    """
+
+    def __init__(self, car_catalog: CarCatalog):
+        self.current = car_catalog
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def snapshot(self) -> CarCatalog:
+        """Текущий неизменяемый снимок каталога"""
+        return self.current
+
+    @contextmanager
+    def transaction(self) -> Iterator[CatalogEditor]:
+        """Группа изменений, публикуемых одним снимком при выходе из блока with без ошибок"""
+        with self.lock:
+            editor = CatalogEditor(self.current)
+            yield editor
+            snapshot = editor.commit()
+            if snapshot is not self.current:
+                self.current = snapshot
+                self.version += 1
+
+    def add(self, car: Union[CarSpecs, dict]) -> int:
+        with self.transaction() as editor:
+            return editor.add(car)
+
+    def update(self, car_id: int, **fields):
+        with self.transaction() as editor:
+            editor.update(car_id, **fields)
+
+    def delist(self, car_id: int):
+        with self.transaction() as editor:
+            editor.delist(car_id)
+
+    def stats(self) -> dict:
+        snapshot = self.current
+        return {"version": self.version, "rows": len(snapshot), "listed": snapshot.listed}
+
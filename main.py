@@ -1,540 +1,36 @@
+import sys
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
-from enum import Enum
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 
-class Power(Enum):
-    HIGH = "высокая"
-    MEDIUM = "средняя"
-    LOW = "низкая"
-
-class MaxSpeed(Enum):
-    HIGH = "высокая"
-    MEDIUM = "средняя"
-    LOW = "низкая"
-
-class Clearance(Enum):
-    BIG = "большой"
-    MEDIUM = "средний"
-    SMALL = "маленький"
-
-class TrunkVolume(Enum):
-    BIG = "большой"
-    MEDIUM = "средний"
-    SMALL = "маленький"
-
-class FuelConsumption(Enum):
-    BIG = "большой"
-    MEDIUM = "средний"
-    SMALL = "маленький"
-
-class Dynamics(Enum):
-    HIGH = "высокая"
-    MEDIUM = "средняя"
-    LOW = "низкая"
-
-class Budget(Enum):
-    VERY_HIGH = "очень высокий"
-    HIGH = "высокий"
-    MEDIUM = "средний"
-    LOW = "низкий"
-    VERY_LOW = "очень низкий"
-
-# Data structure for car specifications
-@dataclass
-class CarSpecs:
-    name: str
-    power: Power
-    max_speed: MaxSpeed
-    clearance: Clearance
-    trunk_volume: TrunkVolume
-    fuel_consumption: FuelConsumption
-    dynamics: Dynamics
-    price: int
-
-# Fuzzy membership functions
-def triangular(x: float, a: float, b: float, c: float) -> float:
-    if x <= a or x >= c:
-        return 0.0
-    elif a <= x <= b:
-        return (x - a) / (b - a)
-    else:
-        return (c - x) / (c - b)
-
-def trapezoidal(x: float, a: float, b: float, c: float, d: float) -> float:
-    if x <= a or x >= d:
-        return 0.0
-    elif b <= x <= c:
-        return 1.0
-    elif a <= x <= b:
-        return (x - a) / (b - a)
-    else:
-        return (d - x) / (d - c)
-
-def gaussian(x: float, c: float, sigma: float) -> float:
-    return np.exp(-((x - c) ** 2) / (2 * sigma ** 2))
-
-def generalized_gaussian(x: float, c: float, sigma: float, p: float) -> float:
-    return np.exp(-((x - c) ** p) / (2 * sigma ** p))
-
-# Defuzzification methods
-def center_of_gravity(x: np.ndarray, y: np.ndarray) -> float:
-    return np.sum(x * y) / np.sum(y)
-
-def mean_of_maximum(x: np.ndarray, y: np.ndarray) -> float:
-    max_y = np.max(y)
-    max_indices = np.where(y == max_y)[0]
-    return np.mean(x[max_indices])
-
-def maximum_membership(x: np.ndarray, y: np.ndarray) -> float:
-    return x[np.argmax(y)]
-
-# Car database
-cars = [
-    CarSpecs("Lada Granta", Power.LOW, MaxSpeed.LOW, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.SMALL, Dynamics.LOW, 800000),
-    CarSpecs("Lada Vesta", Power.LOW, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.LOW, 1200000),
-    CarSpecs("Kia Rio", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1500000),
-    CarSpecs("Hyundai Solaris", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1400000),
-    CarSpecs("Volkswagen Polo", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1600000),
-    CarSpecs("Skoda Rapid", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.MEDIUM, TrunkVolume.BIG, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1700000),
-    CarSpecs("Toyota Camry", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 2500000),
-    CarSpecs("Nissan X-Trail", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 2800000),
-    CarSpecs("Mitsubishi Outlander", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 2600000),
-    CarSpecs("Honda CR-V", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 3000000),
-    CarSpecs("Mazda CX-5", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.MEDIUM, Dynamics.HIGH, 2900000),
-    CarSpecs("Subaru Forester", Power.HIGH, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.MEDIUM, 2700000),
-    CarSpecs("Volkswagen Tiguan", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.HIGH, 3200000),
-    CarSpecs("Skoda Kodiaq", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 3100000),
-    CarSpecs("Audi Q5", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 4500000),
-    CarSpecs("BMW X3", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 4800000),
-    CarSpecs("Mercedes-Benz GLC", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 5000000),
-    CarSpecs("Lexus RX", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 5500000),
-    CarSpecs("Porsche Cayenne", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.MEDIUM, FuelConsumption.BIG, Dynamics.HIGH, 8000000),
-    CarSpecs("Range Rover Sport", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 9000000),
-    CarSpecs("Lada Niva", Power.LOW, MaxSpeed.LOW, Clearance.BIG, TrunkVolume.SMALL, FuelConsumption.MEDIUM, Dynamics.LOW, 1000000),
-    CarSpecs("UAZ Patriot", Power.LOW, MaxSpeed.LOW, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.LOW, 1500000),
-    CarSpecs("Renault Duster", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1800000),
-    CarSpecs("Suzuki Vitara", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 1900000),
-    CarSpecs("Toyota RAV4", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.HIGH, 3500000),
-    CarSpecs("Kia Sportage", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 2200000),
-    CarSpecs("Hyundai Tucson", Power.MEDIUM, MaxSpeed.MEDIUM, Clearance.BIG, TrunkVolume.MEDIUM, FuelConsumption.MEDIUM, Dynamics.MEDIUM, 2300000),
-    CarSpecs("Ford Explorer", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 4000000),
-    CarSpecs("Jeep Grand Cherokee", Power.HIGH, MaxSpeed.HIGH, Clearance.BIG, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 4200000),
-    CarSpecs("Volvo XC90", Power.HIGH, MaxSpeed.HIGH, Clearance.MEDIUM, TrunkVolume.BIG, FuelConsumption.BIG, Dynamics.HIGH, 6000000)
-]
-
-# Fuzzy rules database (30 rules)
-fuzzy_rules = [
-    # Rule 1: Если все параметры низкие -> очень низкий бюджет
-    {
-        "if": {
-            "мощность": "низкая",
-            "макс. скорость": "низкая",
-            "клиренс": "маленький",
-            "объем багажника": "маленький",
-            "расход топлива": "маленький",
-            "динамика": "низкая"
-        },
-        "then": {"бюджет": Budget.VERY_LOW}
-    },
-    # Rule 2: Если большинство параметров низкие, но есть средние -> низкий бюджет
-    {
-        "if": {
-            "мощность": "низкая",
-            "макс. скорость": "средняя",
-            "клиренс": "маленький",
-            "объем багажника": "маленький",
-            "расход топлива": "маленький",
-            "динамика": "низкая"
-        },
-        "then": {"бюджет": Budget.LOW}
-    },
-    # Rule 3: Если половина параметров низкие, половина средние -> низкий бюджет
-    {
-        "if": {
-            "мощность": "низкая",
-            "макс. скорость": "средняя",
-            "клиренс": "маленький",
-            "объем багажника": "средний",
-            "расход топлива": "маленький",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.LOW}
-    },
-    # Rule 4: Если большинство параметров средние, есть низкие -> низкий бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "маленький",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.LOW}
-    },
-    # Rule 5: Если все параметры средние -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 6: Если большинство параметров средние, есть высокие -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "высокая",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 7: Если половина параметров средние, половина высокие -> средний бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 8: Если большинство параметров высокие, есть средние -> высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "средний",
-            "объем багажника": "большой",
-            "расход топлива": "большой",
-            "динамика": "высокая"
-        },
-        "then": {"бюджет": Budget.HIGH}
-    },
-    # Rule 9: Если все параметры высокие -> очень высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "большой",
-            "объем багажника": "большой",
-            "расход топлива": "большой",
-            "динамика": "высокая"
-        },
-        "then": {"бюджет": Budget.VERY_HIGH}
-    },
-    # Rule 10: Если мощность высокая, остальные средние -> средний бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 11: Если динамика высокая, остальные средние -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "высокая"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 12: Если клиренс большой, остальные средние -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "большой",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 13: Если объем багажника большой, остальные средние -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "большой",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 14: Если расход топлива большой, остальные средние -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "большой",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 15: Если мощность и динамика высокие, остальные средние -> высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "высокая"
-        },
-        "then": {"бюджет": Budget.HIGH}
-    },
-    # Rule 16: Если мощность и скорость высокие, остальные средние -> высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.HIGH}
-    },
-    # Rule 17: Если мощность и клиренс высокие, остальные средние -> высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "средняя",
-            "клиренс": "большой",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.HIGH}
-    },
-    # Rule 18: Если мощность и багажник высокие, остальные средние -> высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "большой",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.HIGH}
-    },
-    # Rule 19: Если мощность и расход высокие, остальные средние -> высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "большой",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.HIGH}
-    },
-    # Rule 20: Если три параметра высокие, три средние -> высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "большой",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.HIGH}
-    },
-    # Rule 21: Если четыре параметра высокие, два средние -> очень высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "большой",
-            "объем багажника": "большой",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.VERY_HIGH}
-    },
-    # Rule 22: Если пять параметров высокие, один средний -> очень высокий бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "большой",
-            "объем багажника": "большой",
-            "расход топлива": "большой",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.VERY_HIGH}
-    },
-    # Rule 23: Если два параметра низкие, четыре средние -> низкий бюджет
-    {
-        "if": {
-            "мощность": "низкая",
-            "макс. скорость": "низкая",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.LOW}
-    },
-    # Rule 24: Если три параметра низкие, три средние -> низкий бюджет
-    {
-        "if": {
-            "мощность": "низкая",
-            "макс. скорость": "низкая",
-            "клиренс": "маленький",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.LOW}
-    },
-    # Rule 25: Если четыре параметра низкие, два средние -> очень низкий бюджет
-    {
-        "if": {
-            "мощность": "низкая",
-            "макс. скорость": "низкая",
-            "клиренс": "маленький",
-            "объем багажника": "маленький",
-            "расход топлива": "средний",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.VERY_LOW}
-    },
-    # Rule 26: Если пять параметров низкие, один средний -> очень низкий бюджет
-    {
-        "if": {
-            "мощность": "низкая",
-            "макс. скорость": "низкая",
-            "клиренс": "маленький",
-            "объем багажника": "маленький",
-            "расход топлива": "маленький",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.VERY_LOW}
-    },
-    # Rule 27: Если все параметры средние, кроме одного высокого -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "средний",
-            "динамика": "высокая"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 28: Если все параметры средние, кроме одного низкого -> средний бюджет
-    {
-        "if": {
-            "мощность": "средняя",
-            "макс. скорость": "средняя",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "маленький",
-            "динамика": "средняя"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 29: Если два параметра высокие, два средние, два низкие -> средний бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "средний",
-            "объем багажника": "средний",
-            "расход топлива": "маленький",
-            "динамика": "низкая"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    },
-    # Rule 30: Если три параметра высокие, три низкие -> средний бюджет
-    {
-        "if": {
-            "мощность": "высокая",
-            "макс. скорость": "высокая",
-            "клиренс": "большой",
-            "объем багажника": "маленький",
-            "расход топлива": "маленький",
-            "динамика": "низкая"
-        },
-        "then": {"бюджет": Budget.MEDIUM}
-    }
-]
-
-# Fuzzy membership function parameters
-FUZZY_PARAMS = {
-    "мощность": {
-        "низкая": {"type": "triangular", "params": [1, 3, 5]},
-        "средняя": {"type": "triangular", "params": [3, 5, 7]},
-        "высокая": {"type": "triangular", "params": [5, 7, 10]}
-    },
-    "макс. скорость": {
-        "низкая": {"type": "triangular", "params": [1, 3, 5]},
-        "средняя": {"type": "triangular", "params": [3, 5, 7]},
-        "высокая": {"type": "triangular", "params": [5, 7, 10]}
-    },
-    "клиренс": {
-        "маленький": {"type": "triangular", "params": [1, 3, 5]},
-        "средний": {"type": "triangular", "params": [3, 5, 7]},
-        "большой": {"type": "triangular", "params": [5, 7, 10]}
-    },
-    "объем багажника": {
-        "маленький": {"type": "triangular", "params": [1, 3, 5]},
-        "средний": {"type": "triangular", "params": [3, 5, 7]},
-        "большой": {"type": "triangular", "params": [5, 7, 10]}
-    },
-    "расход топлива": {
-        "маленький": {"type": "triangular", "params": [1, 3, 5]},
-        "средний": {"type": "triangular", "params": [3, 5, 7]},
-        "большой": {"type": "triangular", "params": [5, 7, 10]}
-    },
-    "динамика": {
-        "низкая": {"type": "triangular", "params": [1, 3, 5]},
-        "средняя": {"type": "triangular", "params": [3, 5, 7]},
-        "высокая": {"type": "triangular", "params": [5, 7, 10]}
-    }
-}
-
-# Budget membership function parameters
-BUDGET_PARAMS = {
-    "очень низкий": {"type": "triangular", "params": [500000, 1000000, 2000000]},
-    "низкий": {"type": "triangular", "params": [1000000, 2000000, 3000000]},
-    "средний": {"type": "triangular", "params": [2000000, 3500000, 5000000]},
-    "высокий": {"type": "triangular", "params": [3000000, 5000000, 7000000]},
-    "очень высокий": {"type": "triangular", "params": [5000000, 7000000, 9000000]}
-}
+from knowledge_base import (
+    Power, MaxSpeed, Clearance, TrunkVolume, FuelConsumption, Dynamics, Budget, CarSpecs,
+    make_membership_function, center_of_gravity, mean_of_maximum, maximum_membership,
+    fuzzy_rules, BUDGET_PARAMS
+)
+from fuzzy_engine import budget_curve_cache, fuzzy_registry, FuzzyInferenceCache
+from catalog import catalog, load_catalog, CarCatalog
+from profiling import profiler
+from tracing import Trace
+from session import ForwardChainingSession
+from worker import POLL_INTERVAL_MS, BackgroundWorker, check_cancelled
+from results_view import ForwardResults, ResultsTable
+
+# Шаг анимации индикатора выполнения (мс)
+PROGRESS_STEP_MS = 10
 
 class CarExpertSystemGUI:
-    def __init__(self, root):
+    def __init__(self, root, car_catalog: Optional[CarCatalog] = None):
         self.root = root
+        self.catalog = catalog if car_catalog is None else car_catalog
+        # Повторные запросы с теми же значениями (с точностью до сотых) берутся из кэша
+        self.fuzzy_cache = FuzzyInferenceCache()
+        # Сеанс прямой цепочки: при смене части атрибутов пересчитываются только изменения
+        self.forward_session: Optional[ForwardChainingSession] = None
+        # Вывод выполняется в фоновом потоке, результаты забираются опросом через root.after
+        self.worker = BackgroundWorker()
+        self.poll_id = None
         self.root.title("Экспертная система подбора автомобиля")
         self.root.geometry("480x640")
 
@@ -562,10 +58,21 @@ class CarExpertSystemGUI:
         self.create_crisp_backward_widgets()
         self.create_fuzzy_widgets()
 
+        # Индикатор выполнения запроса
+        self.status_frame = ttk.Frame(self.root)
+        self.status_frame.pack(fill=tk.X)
+        self.progress = ttk.Progressbar(self.status_frame, mode="indeterminate")
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
+        self.status_label = ttk.Label(self.status_frame, text="")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+
         # Поле для вывода результатов
         self.result_text = scrolledtext.ScrolledText(self.root, width=100, height=20)
         self.result_text.pack(fill=tk.BOTH, expand=True)
 
+        # Таблица результатов прямой цепочки: показывается вместо текстового поля
+        self.results_table = ResultsTable(self.root)
+
     def create_crisp_forward_widgets(self):
         # Параметры автомобиля
         ttk.Label(self.crisp_forward_frame, text="Мощность:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
@@ -668,11 +175,48 @@ class CarExpertSystemGUI:
         ttk.Button(self.fuzzy_frame, text="Рассчитать бюджет", command=self.run_fuzzy).grid(row=8, column=0, columnspan=2, pady=10)
 
     def clear_results(self):
+        """Очистка результатов и отмена незавершенного запроса, чтобы его результат не появился позже"""
+        self.worker.cancel()
         self.result_text.delete(1.0, tk.END)
+        self.results_table.clear()
+        self.show_text()
+
+    def show_text(self):
+        self.results_table.frame.pack_forget()
+        self.result_text.pack(fill=tk.BOTH, expand=True)
+
+    def show_table(self):
+        self.result_text.pack_forget()
+        self.results_table.frame.pack(fill=tk.BOTH, expand=True)
 
     def print_result(self, text):
         self.result_text.insert(tk.END, text + "\n")
 
+    def print_lines(self, lines: List[str]):
+        """Вывод всех строк результата одной вставкой в текстовое поле"""
+        self.print_result("\n".join(lines))
+
+    def start_job(self, function, on_done=None):
+        """Запуск вывода в фоновом потоке; незавершенный предыдущий запрос отменяется"""
+        self.worker.submit(function, self.print_lines if on_done is None else on_done, self.show_job_error)
+        self.progress.start(PROGRESS_STEP_MS)
+        self.status_label.config(text="Выполняется...")
+        if self.poll_id is None:
+            self.poll_id = self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+
+    def poll_worker(self):
+        """Вывод готовых результатов; опрос продолжается, пока есть незавершенные запросы"""
+        self.worker.poll()
+        if self.worker.busy:
+            self.poll_id = self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+        else:
+            self.poll_id = None
+            self.progress.stop()
+            self.status_label.config(text="")
+
+    def show_job_error(self, error: Exception):
+        messagebox.showerror("Ошибка", f"Ошибка при выполнении вывода: {error}")
+
     def run_crisp_forward(self):
         self.clear_results()
 
@@ -688,24 +232,30 @@ class CarExpertSystemGUI:
             return
 
         inputs = (power, max_speed, clearance, trunk, fuel, dynamics)
-        suitable_cars = self.forward_chaining(inputs)
-
-        if suitable_cars:
-            self.print_result("\nПодходящие автомобили:")
-            for car, matches in suitable_cars:
-                self.print_result(f"\n{car.name} (совпадений: {matches}/6):")
-                self.print_result(f"- Мощность: {car.power.value} {'✓' if car.power == inputs[0] else '✗'}")
-                self.print_result(
-                    f"- Макс. скорость: {car.max_speed.value} {'✓' if car.max_speed == inputs[1] else '✗'}")
-                self.print_result(f"- Клиренс: {car.clearance.value} {'✓' if car.clearance == inputs[2] else '✗'}")
-                self.print_result(
-                    f"- Объем багажника: {car.trunk_volume.value} {'✓' if car.trunk_volume == inputs[3] else '✗'}")
-                self.print_result(
-                    f"- Расход топлива: {car.fuel_consumption.value} {'✓' if car.fuel_consumption == inputs[4] else '✗'}")
-                self.print_result(f"- Динамика: {car.dynamics.value} {'✓' if car.dynamics == inputs[5] else '✗'}")
-                self.print_result(f"Цена: {car.price:,} руб.")
+        self.start_job(lambda cancelled: self.crisp_forward_results(inputs, cancelled), self.show_forward_results)
+
+    def crisp_forward_results(self, inputs: tuple, cancelled=None):
+        """Найденные автомобили для таблицы или строки с наиболее похожими (выполняется в фоновом потоке)"""
+        check_cancelled(cancelled)
+        ids, matches = self.forward_matches(inputs)
+        check_cancelled(cancelled)
+        if ids.size:
+            return ForwardResults(self.catalog, inputs, ids, matches)
+
+        lines = ["\nПодходящих автомобилей не найдено.", "\nНаиболее похожие автомобили:"]
+        similar = self.catalog.top_k(inputs, k=3)
+        check_cancelled(cancelled)
+        for car, matches in similar:
+            lines.append(f"{car.name} (совпадений: {matches}/6), цена: {car.price:,} руб.")
+        return lines
+
+    def show_forward_results(self, result):
+        """Таблица найденных автомобилей (строки подгружаются при прокрутке) или текст без совпадений"""
+        if isinstance(result, ForwardResults):
+            self.show_table()
+            self.results_table.show(result)
         else:
-            self.print_result("\nПодходящих автомобилей не найдено.")
+            self.print_lines(result)
 
     def run_crisp_backward(self):
         self.clear_results()
@@ -722,13 +272,23 @@ class CarExpertSystemGUI:
             return
 
         inputs = (power, max_speed, clearance, trunk, fuel, dynamics)
-        suitable_car = self.backward_chaining(inputs)
+        self.start_job(lambda cancelled: self.crisp_backward_lines(inputs, cancelled))
+
+    def crisp_backward_lines(self, inputs: tuple, cancelled=None) -> List[str]:
+        """Строки результата обратной цепочки с трассой проверки (выполняется в фоновом потоке)"""
+        check_cancelled(cancelled)
+        trace = Trace()
+        suitable_car = self.backward_chaining(inputs, trace)
+        # Отмененному запросу строки не нужны
+        check_cancelled(cancelled)
 
+        lines = list(trace.lines())
         if suitable_car:
-            self.print_result(f"\nРекомендуемый автомобиль: {suitable_car.name}")
-            self.print_result(f"Цена: {suitable_car.price:,} руб.")
+            lines.append(f"\nРекомендуемый автомобиль: {suitable_car.name}")
+            lines.append(f"Цена: {suitable_car.price:,} руб.")
         else:
-            self.print_result("\nПодходящих автомобилей не найдено.")
+            lines.append("\nПодходящих автомобилей не найдено.")
+        return lines
 
     def run_fuzzy(self):
         self.clear_results()
@@ -770,196 +330,151 @@ class CarExpertSystemGUI:
             "Максимум степени принадлежности": "maximum_membership"
         }.get(self.defuzz_type.get(), "center_of_gravity")
 
-        budget_membership, budget = self.fuzzy_inference(inputs, defuzzification_type)
+        self.start_job(lambda cancelled: self.fuzzy_lines(inputs, defuzzification_type, fuzzification_type,
+                                                          cancelled))
 
-        self.print_result(f"\nПолученный бюджет после дефаззификации: {budget:,.0f} руб.")
+    def fuzzy_lines(self, inputs: Dict[str, float], defuzzification_type: str, fuzzification_type: str,
+                    cancelled=None) -> List[str]:
+        """Строки результата нечеткого вывода с трассой рассуждений (выполняется в фоновом потоке)"""
+        check_cancelled(cancelled)
+        trace = Trace()
+        budget_membership, budget = self.fuzzy_inference(inputs, defuzzification_type, fuzzification_type, trace)
+        check_cancelled(cancelled)
 
+        lines = list(trace.lines())
+        lines.append(f"\nПолученный бюджет после дефаззификации: {budget:,.0f} руб.")
+
+        check_cancelled(cancelled)
         closest_car, diff = self.find_closest_car(budget)
-        self.print_result(f"\nРекомендуемый автомобиль (наиболее близкий к бюджету):")
-        self.print_result(f"{closest_car.name} ({closest_car.price:,} руб.)")
-        self.print_result(f"Разница с бюджетом: {int(diff):,} руб.")
+        lines.append(f"\nРекомендуемый автомобиль (наиболее близкий к бюджету):")
+        lines.append(f"{closest_car.name} ({closest_car.price:,} руб.)")
+        lines.append(f"Разница с бюджетом: {int(diff):,} руб.")
+        return lines
 
     def forward_chaining(self, inputs: Tuple[Power, MaxSpeed, Clearance, TrunkVolume, FuelConsumption, Dynamics]) -> \
     List[Tuple[CarSpecs, int]]:
         """Прямая цепочка рассуждений для четкой ЭС"""
-        power, max_speed, clearance, trunk, fuel, dynamics = inputs
-        suitable_cars = []
-
-        for car in cars:
-            matches = 0
-            total = 6
-
-            if car.power == power:
-                matches += 1
-            if car.max_speed == max_speed:
-                matches += 1
-            if car.clearance == clearance:
-                matches += 1
-            if car.trunk_volume == trunk:
-                matches += 1
-            if car.fuel_consumption == fuel:
-                matches += 1
-            if car.dynamics == dynamics:
-                matches += 1
-
-            if matches >= 5:  # Минимум 5 из 6 параметров должны совпадать
-                suitable_cars.append((car, matches))
-
-        return suitable_cars
-
-    def backward_chaining(self, inputs: Tuple[Power, MaxSpeed, Clearance, TrunkVolume, FuelConsumption, Dynamics]) -> \
-    Optional[CarSpecs]:
+        ids, matches = self.forward_matches(inputs)
+        return [(self.catalog.car(i), m) for i, m in zip(ids, matches.tolist())]
+
+    def forward_matches(self, inputs: tuple) -> Tuple[np.ndarray, np.ndarray]:
+        """Номера подходящих автомобилей в порядке каталога и число совпадений у каждого"""
+        if self.forward_session is None or self.forward_session.catalog is not self.catalog:
+            # Минимум 5 из 6 параметров должны совпадать
+            self.forward_session = ForwardChainingSession(self.catalog, inputs, min_matches=5)
+        else:
+            self.forward_session.set_inputs(inputs)
+        ids = self.forward_session.matching_ids()
+        return ids, self.forward_session.match_counts(ids)
+
+    def backward_chaining(self, inputs: Tuple[Power, MaxSpeed, Clearance, TrunkVolume, FuelConsumption, Dynamics],
+                          trace: Optional[Trace] = None) -> Optional[CarSpecs]:
         """Обратная цепочка рассуждений для четкой ЭС"""
-        power, max_speed, clearance, trunk, fuel, dynamics = inputs
-
-        for car in cars:
-            self.print_result(f"\nПроверка {car.name}:")
-            matches = 0
-            total = 6
-
-            # Проверка мощности
-            self.print_result(f"- Мощность: {car.power.value} {'✓' if car.power == power else '✗'}")
-            if car.power == power:
-                matches += 1
-            else:
-                self.print_result(f"Вариант {car.name} отвергнут.")
-                continue
-
-            # Проверка максимальной скорости
-            self.print_result(f"- Макс. скорость: {car.max_speed.value} {'✓' if car.max_speed == max_speed else '✗'}")
-            if car.max_speed == max_speed:
-                matches += 1
-            else:
-                self.print_result(f"Вариант {car.name} отвергнут.")
-                continue
-
-            # Проверка клиренса
-            self.print_result(f"- Клиренс: {car.clearance.value} {'✓' if car.clearance == clearance else '✗'}")
-            if car.clearance == clearance:
-                matches += 1
-            else:
-                self.print_result(f"Вариант {car.name} отвергнут.")
-                continue
-
-            # Проверка объема багажника
-            self.print_result(f"- Объем багажника: {car.trunk_volume.value} {'✓' if car.trunk_volume == trunk else '✗'}")
-            if car.trunk_volume == trunk:
-                matches += 1
-            else:
-                self.print_result(f"Вариант {car.name} отвергнут.")
-                continue
-
-            # Проверка расхода топлива
-            self.print_result(f"- Расход топлива: {car.fuel_consumption.value} {'✓' if car.fuel_consumption == fuel else '✗'}")
-            if car.fuel_consumption == fuel:
-                matches += 1
-            else:
-                self.print_result(f"Вариант {car.name} отвергнут.")
-                continue
-
-            # Проверка динамики
-            self.print_result(f"- Динамика: {car.dynamics.value} {'✓' if car.dynamics == dynamics else '✗'}")
-            if car.dynamics == dynamics:
-                matches += 1
-            else:
-                self.print_result(f"Вариант {car.name} отвергнут.")
-                continue
-
-            # Если все параметры совпали
-            self.print_result(f"Вариант {car.name} подходит. Проверка окончена.")
-            return car
-
-        return None
-
-    def get_membership_value(self, x: float, param_type: str, param_name: str) -> float:
+        # Первый автомобиль с точным совпадением берется из таблицы готовых ответов
+        car = self.catalog.backward_chaining(inputs)
+        if car is not None and trace is not None:
+            trace.add("check", car)
+        return car
+
+    def get_membership_value(self, x: float, param_type: str, param_name: str,
+                             fuzzification_type: str = "triangular") -> float:
         """Получение значения функции принадлежности"""
-        params = FUZZY_PARAMS[param_type][param_name]
-        if params["type"] == "triangular":
-            return triangular(x, *params["params"])
-        elif params["type"] == "trapezoidal":
-            return trapezoidal(x, *params["params"])
-        elif params["type"] == "gaussian":
-            return gaussian(x, *params["params"])
-        elif params["type"] == "generalized_gaussian":
-            return generalized_gaussian(x, *params["params"])
-        return 0.0
+        return float(fuzzy_registry.evaluator(fuzzification_type, param_type, param_name)(x))
 
     def get_budget_membership(self, x: float, budget_level: str) -> float:
         """Получение значения функции принадлежности для бюджета"""
         params = BUDGET_PARAMS[budget_level]
-        if params["type"] == "triangular":
-            return triangular(x, *params["params"])
-        elif params["type"] == "trapezoidal":
-            return trapezoidal(x, *params["params"])
-        elif params["type"] == "gaussian":
-            return gaussian(x, *params["params"])
-        elif params["type"] == "generalized_gaussian":
-            return generalized_gaussian(x, *params["params"])
-        return 0.0
-
-    def fuzzy_inference(self, inputs: Dict[str, float], defuzzification_type: str = "center_of_gravity") -> Tuple[Dict[str, float], float]:
+        return float(make_membership_function(params["type"], params["params"])(x))
+
+    def fuzzy_inference(self, inputs: Dict[str, float], defuzzification_type: str = "center_of_gravity",
+                        fuzzification_type: str = "triangular",
+                        trace: Optional[Trace] = None) -> Tuple[Dict[str, float], float]:
+        """Нечеткий вывод; при переданной трассе в нее записываются шаги рассуждения"""
+        # Вывод выполняется для значений, округленных до точности кэша
+        key = self.fuzzy_cache.key(inputs.values(), fuzzification_type, defuzzification_type)
+        values = dict(zip(inputs, self.fuzzy_cache.values(key)))
+        result = self.fuzzy_cache.lookup(key)
+        if result is None:
+            result = self.compute_fuzzy_inference(values, defuzzification_type, fuzzification_type)
+            self.fuzzy_cache.store(key, result)
+        membership_values, rule_strengths, budget_membership, budget = result
+
+        if trace is not None:
+            trace.add("section", "Значения функций принадлежности для входных параметров")
+            trace.add("membership", values, membership_values)
+            trace.add("section", "Применение правил")
+            trace.add("rules", fuzzy_rules, rule_strengths)
+            trace.add("section", "Дефаззификация")
+            trace.add("budget_levels", budget_membership)
+            if budget is None:
+                trace.add("warning", "Все значения функций принадлежности равны нулю!")
+
+        # Если все функции принадлежности равны нулю, возвращаем средний бюджет как запасной вариант
+        return budget_membership, 3500000 if budget is None else budget
+
+    def compute_fuzzy_inference(self, inputs: Dict[str, float], defuzzification_type: str = "center_of_gravity",
+                                fuzzification_type: str = "triangular") -> tuple:
+        """Принадлежности входов, силы правил, принадлежности уровней бюджета и бюджет (None, если y = 0)"""
         # Фаззификация входных переменных
-        membership_values = {}
-        self.print_result("\nЗначения функций принадлежности для входных параметров:")
-        for param, value in inputs.items():
-            membership_values[param] = {}
-            self.print_result(f"\n{param} (значение: {value}):")
-            for level in ["низкая", "средняя", "высокая"] \
-                if param in ["мощность", "макс. скорость", "динамика"] \
-                else ["маленький", "средний", "большой"]:
-                membership_values[param][level] = self.get_membership_value(value, param, level)
-                self.print_result(f"- {level}: {membership_values[param][level]:.3f}")
+        with profiler.stage("fuzzification"):
+            membership_values = {}
+            for param, value in inputs.items():
+                membership_values[param] = {}
+                for level in ["низкая", "средняя", "высокая"] \
+                    if param in ["мощность", "макс. скорость", "динамика"] \
+                    else ["маленький", "средний", "большой"]:
+                    membership_values[param][level] = self.get_membership_value(value, param, level,
+                                                                                fuzzification_type)
 
         # Агрегация правил
-        budget_membership = {level: 0.0 for level in Budget}
+        with profiler.stage("rule_aggregation"):
+            budget_membership = {level: 0.0 for level in Budget}
+            rule_strengths = []
 
-        self.print_result("\nПрименение правил:")
-        for i, rule in enumerate(fuzzy_rules, 1):
-            # Вычисление степени истинности правила как среднего значения активаций
-            activations = []
-            for param, level in rule["if"].items():
-                activations.append(membership_values[param][level])
+            for rule in fuzzy_rules:
+                # Вычисление степени истинности правила как среднего значения активаций
+                activations = []
+                for param, level in rule["if"].items():
+                    activations.append(membership_values[param][level])
 
-            # Используем среднее значение активаций вместо минимума
-            rule_strength = sum(activations) / len(activations)
+                # Используем среднее значение активаций вместо минимума
+                rule_strength = sum(activations) / len(activations)
+                rule_strengths.append(rule_strength)
 
-            # Обновление выходной переменной
-            budget_level = rule["then"]["бюджет"]
-            budget_membership[budget_level] = max(budget_membership[budget_level], rule_strength)
-            self.print_result(f"Правило {i}: {budget_level.value} = {rule_strength:.3f}")
+                # Обновление выходной переменной
+                budget_level = rule["then"]["бюджет"]
+                budget_membership[budget_level] = max(budget_membership[budget_level], rule_strength)
 
         # Дефаззификация
-        x = np.linspace(500000, 9000000, 1000)
-        y = np.zeros_like(x)
+        with profiler.stage("defuzzification"):
+            x = budget_curve_cache.grid()
+            y = np.zeros_like(x)
 
-        self.print_result("\nДефаззификация:")
-        for budget_level, membership in budget_membership.items():
-            if membership > 0:
-                self.print_result(f"{budget_level.value}: {membership:.3f}")
-                y += membership * np.array([self.get_budget_membership(xi, budget_level.value) for xi in x])
+            for budget_level, membership in budget_membership.items():
+                if membership > 0:
+                    y += membership * budget_curve_cache.curve(budget_level.value)
 
-        if np.sum(y) == 0:
-            self.print_result("\nПредупреждение: Все значения функций принадлежности равны нулю!")
-            # Возвращаем средний бюджет как запасной вариант
-            return budget_membership, 3500000
+            if np.sum(y) == 0:
+                return membership_values, rule_strengths, budget_membership, None
 
-        if defuzzification_type == "center_of_gravity":
-            budget = center_of_gravity(x, y)
-        elif defuzzification_type == "mean_of_maximum":
-            budget = mean_of_maximum(x, y)
-        else:  # maximum_membership
-            budget = maximum_membership(x, y)
+            if defuzzification_type == "center_of_gravity":
+                budget = center_of_gravity(x, y)
+            elif defuzzification_type == "mean_of_maximum":
+                budget = mean_of_maximum(x, y)
+            else:  # maximum_membership
+                budget = maximum_membership(x, y)
 
-        return budget_membership, budget
+        return membership_values, rule_strengths, budget_membership, budget
 
     def find_closest_car(self, budget: float) -> Tuple[CarSpecs, float]:
         """Поиск автомобиля с наиболее близкой ценой к бюджету"""
-        closest_car = min(cars, key=lambda car: abs(car.price - budget))
-        return closest_car, abs(closest_car.price - budget)
+        return self.catalog.closest_car(budget)
 
 def main():
+    # Необязательный аргумент - путь к снимку, CSV или JSONL файлу каталога
+    car_catalog = load_catalog(sys.argv[1]) if len(sys.argv) > 1 else None
     root = tk.Tk()
-    app = CarExpertSystemGUI(root)
+    app = CarExpertSystemGUI(root, car_catalog)
     root.mainloop()
 
 if __name__ == "__main__":
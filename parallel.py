@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import CarCatalog, catalog
+from fuzzy_engine import CompiledRules, FuzzyParamRegistry, compile_rules
+from knowledge_base import fuzzy_rules, FUZZY_PARAM_SETS, BUDGET_PARAMS
+
+# Описание массива в разделяемой памяти: (имя блока, форма, тип)
+ArrayDescriptor = Tuple[str, tuple, str]
+
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[Dict[str, ArrayDescriptor], List[SharedMemory]]:
+    """Копирование массивов в блоки разделяемой памяти"""
+    descriptors, blocks = {}, []
+    for key, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        block = SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        descriptors[key] = (block.name, values.shape, values.dtype.str)
+        blocks.append(block)
+    return descriptors, blocks
+
+
+def _attach_block(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # До Python 3.13 блок регистрируется повторно в трекере ресурсов родительского процесса;
+        # это безопасно, блок удаляет только ParallelExecutor
+        return SharedMemory(name=name)
+
+
+def attach_arrays(descriptors: Dict[str, ArrayDescriptor]) -> Tuple[Dict[str, np.ndarray], List[SharedMemory]]:
+    """Подключение к массивам в разделяемой памяти без копирования (только чтение)"""
+    arrays, blocks = {}, []
+    for key, (name, shape, dtype) in descriptors.items():
+        block = _attach_block(name)
+        values = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        values.flags.writeable = False
+        arrays[key] = values
+        blocks.append(block)
+    return arrays, blocks
+
+
+# Состояние рабочего процесса: каталог и движки, построенные над разделяемой памятью
+_worker_state: dict = {}
+
+
+def _worker_init(catalog_descriptors: Dict[str, ArrayDescriptor], rule_descriptors: Dict[str, ArrayDescriptor],
+                 param_sets: Dict[str, dict], budget_params: Dict[str, dict], engine_options: dict):
+    catalog_arrays, catalog_blocks = attach_arrays(catalog_descriptors)
+    rule_arrays, rule_blocks = attach_arrays(rule_descriptors)
+    _worker_state["blocks"] = catalog_blocks + rule_blocks
+    _worker_state["catalog"] = CarCatalog.from_arrays(catalog_arrays)
+    _worker_state["registry"] = FuzzyParamRegistry(param_sets, budget_params=budget_params,
+                                                   compiled_rules=CompiledRules(**rule_arrays), **engine_options)
+
+
+def _worker_call(task: tuple):
+    function, chunk = task
+    return function(chunk, _worker_state["catalog"], _worker_state["registry"])
+
+
+class ParallelExecutor:
+    """Пул процессов для пакетной обработки.
+
+    Массивы каталога и скомпилированных правил один раз копируются в разделяемую
+    память, рабочие процессы подключаются к ним без сериализации. Части запросов
+    распределяются по процессам, результаты возвращаются в порядке поступления.
+    """
+
+    def __init__(self, car_catalog: Optional[CarCatalog] = None, rules: Optional[List[dict]] = None,
+                 param_sets: Optional[Dict[str, dict]] = None, budget_params: Optional[Dict[str, dict]] = None,
+                 processes: Optional[int] = None, **engine_options):
+        car_catalog = catalog if car_catalog is None else car_catalog
+        rules = fuzzy_rules if rules is None else rules
+        param_sets = FUZZY_PARAM_SETS if param_sets is None else param_sets
+        budget_params = BUDGET_PARAMS if budget_params is None else budget_params
+        # Уровни терминов во всех наборах совпадают, поэтому правила компилируются один раз
+        compiled = compile_rules(rules, next(iter(param_sets.values())))
+
+        catalog_descriptors, catalog_blocks = share_arrays(car_catalog.arrays())
+        rule_descriptors, rule_blocks = share_arrays(compiled.arrays())
+        self._blocks = catalog_blocks + rule_blocks
+        self.processes = processes or os.cpu_count() or 1
+        # Ограничение числа частей в очереди, чтобы не читать весь входной поток заранее
+        self.max_pending = 2 * self.processes
+        try:
+            self._pool = multiprocessing.get_context().Pool(
+                self.processes, initializer=_worker_init,
+                initargs=(catalog_descriptors, rule_descriptors, param_sets, budget_params, engine_options))
+        except BaseException:
+            self._release()
+            raise
+
+    def map(self, function: Callable, chunks: Iterable) -> Iterator:
+        """Результаты function(часть, каталог, реестр) для каждой части в исходном порядке"""
+        pending = deque()
+        for chunk in chunks:
+            pending.append(self._pool.apply_async(_worker_call, ((function, chunk),)))
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def _release(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def close(self):
+        """Остановка процессов и освобождение разделяемой памяти"""
+        self._pool.close()
+        self._pool.join()
+        self._release()
+
+    def __enter__(self) -> "ParallelExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._pool.terminate()
+        self.close()
@@ -0,0 +1,147 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Верхние границы корзин гистограммы длительностей (секунды); последняя корзина - все, что больше
+HISTOGRAM_BOUNDS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+# Хук получает имя этапа и его длительность в секундах
+StageHook = Callable[[str, float], None]
+
+_NULL_STAGE = nullcontext()
+
+
+class StageStats:
+    """Число вызовов, суммарное и максимальное время и гистограмма длительностей этапа"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+
+    def report(self) -> dict:
+        labels = [f"<={bound:g}s" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]:g}s"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, time.perf_counter() - self.started)
+
+
+class Profiler:
+    """Замер времени этапов вывода.
+
+    Выключенный профилировщик возвращает из stage() общий пустой контекст, поэтому
+    инструментированный код почти ничего не теряет. Включенный накапливает по каждому
+    этапу счетчики и гистограмму и передает длительности подключенным хукам.
+    Этапы могут выполняться в разных потоках (сервис, фоновый вывод интерфейса),
+    поэтому счетчики меняются под блокировкой.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages: Dict[str, StageStats] = {}
+        self.hooks: List[StageHook] = []
+        self.lock = threading.Lock()
+
+    def stage(self, name: str):
+        """Контекстный менеджер, замеряющий время этапа name"""
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def record(self, name: str, seconds: float):
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.add(seconds)
+        for hook in self.hooks:
+            hook(name, seconds)
+
+    def add_hook(self, hook: StageHook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: StageHook):
+        self.hooks.remove(hook)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    @contextmanager
+    def capture(self) -> Iterator["Profiler"]:
+        """Временное включение замеров внутри блока with"""
+        enabled, self.enabled = self.enabled, True
+        try:
+            yield self
+        finally:
+            self.enabled = enabled
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+
+    def report(self) -> Dict[str, dict]:
+        with self.lock:
+            return {name: stats.report() for name, stats in self.stages.items()}
+
+
+class RequestProfile:
+    """Результат профилирования одного запроса через cProfile"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.stats: Optional[pstats.Stats] = None
+
+    def text(self, sort: str = "cumulative", limit: int = 30) -> str:
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+@contextmanager
+def profile_request() -> Iterator[RequestProfile]:
+    """Профилирование cProfile кода внутри блока with (для разбора одного медленного запроса)"""
+    result = RequestProfile()
+    result.profile.enable()
+    try:
+        yield result
+    finally:
+        result.profile.disable()
+        result.stats = pstats.Stats(result.profile)
+
+
+# Общий профилировщик движка, каталога и интерфейса (по умолчанию выключен)
+profiler = Profiler()
@@ -0,0 +1,154 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+import tkinter as tk
+from tkinter import ttk
+
+from catalog import ATTRIBUTES, LEVEL_MEMBERS, CarCatalog, encode_profile
+
+# Число строк, добавляемых в таблицу за один раз
+PAGE_SIZE = 100
+
+# Следующая страница подгружается, когда нижняя граница видимой области проходит эту долю
+LOAD_THRESHOLD = 0.9
+
+# Заголовки столбцов атрибутов в порядке ATTRIBUTES
+ATTRIBUTE_HEADINGS = ("Мощность", "Макс. скорость", "Клиренс", "Объем багажника", "Расход топлива", "Динамика")
+
+# Столбцы, по которым можно сортировать, и направление сортировки при первом выборе
+SORT_KEYS = {"matches": True, "price": False}
+
+
+class ForwardResults:
+    """Результат прямой цепочки для постраничного вывода.
+
+    Хранит только номера найденных автомобилей и число совпадений; строки таблицы
+    строятся по запрошенному диапазону. Сортировка переставляет номера и не
+    повторяет вывод.
+    """
+
+    def __init__(self, car_catalog: CarCatalog, inputs: Sequence, ids: np.ndarray, matches: np.ndarray):
+        self.catalog = car_catalog
+        self.query = encode_profile(inputs)
+        self.ids = ids
+        self.matches = matches
+        self.order = np.arange(ids.size)
+        self.sort_key: Optional[str] = None
+        self.descending = False
+
+    def __len__(self) -> int:
+        return self.ids.size
+
+    def sort(self, key: Optional[str], descending: bool = False):
+        """Порядок по числу совпадений или цене; при равных значениях - порядок каталога"""
+        if key is None:
+            self.order = np.arange(self.ids.size)
+        else:
+            values = self.matches if key == "matches" else self.catalog.prices[self.ids]
+            values = values.astype(np.int64)
+            self.order = np.argsort(-values if descending else values, kind="stable")
+        self.sort_key = key
+        self.descending = descending
+
+    def rows(self, start: int, stop: int) -> List[tuple]:
+        """Строки таблицы (название, совпадения, цена, значения атрибутов с отметками) для позиций [start, stop)"""
+        positions = self.order[start:stop]
+        ids = self.ids[positions]
+        codes = self.catalog.codes[ids]
+        marks = np.where(codes == self.query, "✓", "✗")
+        rows = []
+        for i, car_id in enumerate(ids.tolist()):
+            levels = [f"{LEVEL_MEMBERS[j][code].value} {marks[i, j]}" for j, code in enumerate(codes[i].tolist())]
+            rows.append((self.catalog.name(car_id), f"{int(self.matches[positions[i]])}/6",
+                         f"{int(self.catalog.prices[car_id]):,}", *levels))
+        return rows
+
+
+class ResultsTable:
+    """Таблица результатов на ttk.Treeview с подгрузкой строк по мере прокрутки.
+
+    В дерево добавляются только страницы, до которых дошла прокрутка, поэтому время
+    вывода не зависит от числа найденных автомобилей. Щелчок по заголовку
+    "Совпадений" или "Цена" сортирует уже найденные результаты.
+    """
+
+    def __init__(self, parent, page_size: int = PAGE_SIZE):
+        self.page_size = page_size
+        self.model: Optional[ForwardResults] = None
+        self.loaded = 0
+        self.loading = False
+
+        self.frame = ttk.Frame(parent)
+        columns = ("matches", "price") + ATTRIBUTES
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="tree headings")
+        self.tree.heading("#0", text="Автомобиль")
+        self.tree.column("#0", width=160, stretch=False)
+        for column, heading in zip(columns, ("Совпадений", "Цена, руб.") + ATTRIBUTE_HEADINGS):
+            if column in SORT_KEYS:
+                self.tree.heading(column, text=heading, command=lambda key=column: self.sort(key))
+            else:
+                self.tree.heading(column, text=heading)
+            self.tree.column(column, width=110, stretch=False)
+
+        self.y_scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.x_scrollbar = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(yscrollcommand=self.on_scroll, xscrollcommand=self.x_scrollbar.set)
+        self.status = ttk.Label(self.frame, text="")
+
+        self.status.grid(row=0, column=0, columnspan=2, sticky=tk.W, padx=5)
+        self.tree.grid(row=1, column=0, sticky=tk.NSEW)
+        self.y_scrollbar.grid(row=1, column=1, sticky=tk.NS)
+        self.x_scrollbar.grid(row=2, column=0, sticky=tk.EW)
+        self.frame.rowconfigure(1, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+
+    def show(self, model: ForwardResults):
+        """Вывод нового результата: в таблицу попадает только первая страница"""
+        self.model = model
+        self.render()
+
+    def render(self):
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.update_headings()
+        self.load_more()
+        self.tree.yview_moveto(0)
+
+    def load_more(self):
+        """Добавление следующей страницы строк"""
+        self.loading = False
+        if self.model is None or self.loaded >= len(self.model):
+            return
+        stop = min(self.loaded + self.page_size, len(self.model))
+        for name, *values in self.model.rows(self.loaded, stop):
+            self.tree.insert("", tk.END, text=name, values=values)
+        self.loaded = stop
+        self.status.config(text=f"Подходящие автомобили: показано {self.loaded} из {len(self.model)}")
+
+    def on_scroll(self, first: str, last: str):
+        self.y_scrollbar.set(first, last)
+        if not self.loading and float(last) >= LOAD_THRESHOLD and self.model is not None \
+                and self.loaded < len(self.model):
+            # Подгрузка откладывается до простоя, чтобы не менять дерево внутри его же обработчика
+            self.loading = True
+            self.tree.after_idle(self.load_more)
+
+    def sort(self, key: str):
+        """Сортировка по столбцу key; повторный щелчок меняет направление"""
+        if self.model is None:
+            return
+        descending = not self.model.descending if self.model.sort_key == key else SORT_KEYS[key]
+        self.model.sort(key, descending)
+        self.render()
+
+    def update_headings(self):
+        for key, heading in (("matches", "Совпадений"), ("price", "Цена, руб.")):
+            if self.model is not None and self.model.sort_key == key:
+                heading += " ▼" if self.model.descending else " ▲"
+            self.tree.heading(key, text=heading)
+
+    def clear(self):
+        self.model = None
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.status.config(text="")
@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import contextvars
+import json
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from batch import parse_crisp_query, parse_fuzzy_query
+from budget_surface import BudgetSurface, load_surfaces
+from session import ForwardChainingSession
+from catalog import CATALOG_FIELDS, CarCatalog, catalog, load_catalog
+from live_catalog import EDITABLE_FIELDS, LiveCatalog
+from fuzzy_engine import BUDGET_LEVELS, FUZZIFICATION_TYPES, DEFUZZIFICATION_TYPES, DEFAULT_CACHE_SIZE, \
+    DEFAULT_CACHE_DECIMALS, FuzzyInferenceCache, FuzzyParamRegistry, fuzzy_registry
+from profiling import profiler, profile_request
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Окно ожидания (секунды) и максимальный размер объединяемой группы нечетких запросов
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 4096
+
+# Число последних запросов, по которым считаются перцентили задержки
+LATENCY_SAMPLES = 10000
+
+MAX_BODY_SIZE = 1 << 20
+
+# Интервал (секунды) проверки правил и параметров кэшем: сверка сигнатур занимает ~0.1 мс,
+# поэтому в сервисе она выполняется не при каждом запросе
+CACHE_CHECK_INTERVAL = 0.05
+
+# Число хранимых сеансов прямой цепочки (вытесняются давно не использованные)
+MAX_SESSIONS = 1024
+
+BUDGET_LEVEL_NAMES = tuple(level.value for level in BUDGET_LEVELS)
+
+HTTP_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+# Признак запроса, выполняемого под cProfile (?profile=1)
+_profiled_request = contextvars.ContextVar("profiled_request", default=False)
+
+
+async def run_blocking(executor: Optional[ThreadPoolExecutor], function, *args):
+    """function(*args) в потоке executor; в профилируемом запросе - в текущем потоке.
+
+    cProfile видит только поток, в котором включен, поэтому работа профилируемого
+    запроса не переносится в другой поток.
+    """
+    if _profiled_request.get():
+        return function(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyStats:
+    """Число запросов и перцентили задержки по каждому пути"""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.samples = samples
+        self.latencies: Dict[str, deque] = {}
+        self.counts: Dict[str, int] = {}
+
+    def record(self, path: str, seconds: float):
+        self.latencies.setdefault(path, deque(maxlen=self.samples)).append(seconds)
+        self.counts[path] = self.counts.get(path, 0) + 1
+
+    def report(self) -> dict:
+        report = {}
+        for path, values in self.latencies.items():
+            p50, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 99]) * 1000
+            report[path] = {"count": self.counts[path], "p50_ms": round(p50, 3), "p99_ms": round(p99, 3)}
+        return report
+
+
+def _car_id(body: dict) -> int:
+    """Номер автомобиля из поля id запроса изменения каталога"""
+    try:
+        return int(body["id"])
+    except (TypeError, ValueError):
+        raise ValueError(f"недопустимый номер автомобиля: {body['id']!r}") from None
+
+
+class FuzzyBatcher:
+    """Объединение нечетких запросов, пришедших в течение окна, в один векторизованный вывод.
+
+    При заданном кэше повторные запросы отвечаются без вывода, а в группу попадают
+    только промахи (со значениями, округленными до точности кэша). Запросы с типами,
+    для которых загружена поверхность бюджета, отвечаются интерполяцией по ней.
+    Каталог может быть изменяемым (LiveCatalog): группа подбирает автомобили по одному снимку.
+    Вывод группы выполняется в отдельном потоке (numpy отпускает GIL), чтобы цикл событий
+    продолжал обслуживать другие запросы. Профилируемый запрос выводится отдельно и сразу.
+    """
+
+    def __init__(self, registry: FuzzyParamRegistry, car_catalog: Union[CarCatalog, LiveCatalog],
+                 window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH,
+                 cache: Optional[FuzzyInferenceCache] = None,
+                 surfaces: Optional[Dict[Tuple[str, str], BudgetSurface]] = None):
+        self.registry = registry
+        self.catalog = car_catalog
+        self.window = window
+        self.max_batch = max_batch
+        self.cache = cache
+        self.surfaces = surfaces or {}
+        self.pending: Dict[Tuple[str, str], List[tuple]] = {}
+        # Отложенный сброс каждой ожидающей группы; отменяется, если группа заполнилась раньше
+        self.timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self.batches = 0
+        self.batched_requests = 0
+        # Группы выводятся по очереди в одном потоке; ссылки на задачи не дают сборщику их удалить
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fuzzy-batch")
+        self.tasks = set()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    def _response(self, car_catalog: CarCatalog, membership: Optional[np.ndarray], budget: float, car_id: int,
+                  diff: float) -> dict:
+        response = {"budget": round(budget, 2)}
+        if membership is None:
+            # Бюджет получен интерполяцией по поверхности, принадлежности уровней не вычислялись
+            response["approximate"] = True
+        else:
+            response["membership"] = dict(zip(BUDGET_LEVEL_NAMES, np.round(membership, 6).tolist()))
+        response.update(name=car_catalog.name(car_id), price=int(car_catalog.prices[car_id]),
+                        difference=round(float(diff), 2))
+        return response
+
+    async def infer(self, values: List[float], fuzzification_type: str, defuzzification_type: str) -> dict:
+        surface = self.surfaces.get((fuzzification_type, defuzzification_type))
+        if surface is not None:
+            budget = float(surface.interpolate([values])[0])
+            car_catalog = self.catalog.snapshot()
+            car_id, diff = car_catalog.closest_ids(budget)
+            return self._response(car_catalog, None, budget, int(car_id), diff)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(values, fuzzification_type, defuzzification_type)
+            cached = self.cache.lookup(cache_key)
+            if cached is not None:
+                membership, budget = cached
+                car_catalog = self.catalog.snapshot()
+                car_id, diff = car_catalog.closest_ids(budget)
+                return self._response(car_catalog, membership, budget, int(car_id), diff)
+            values = self.cache.values(cache_key)
+
+        key = (fuzzification_type, defuzzification_type)
+        if _profiled_request.get():
+            budget_membership, budgets, responses = self._infer_batch(key, np.array([values]))
+            if cache_key is not None:
+                self.cache.store(cache_key, (budget_membership[0], float(budgets[0])))
+            return responses[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = self.pending.setdefault(key, [])
+        group.append((values, cache_key, future))
+        if len(group) >= self.max_batch:
+            self._flush(key)
+        elif len(group) == 1:
+            self.timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple[str, str]):
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self.pending.pop(key, None)
+        if not group:
+            return
+        self.batches += 1
+        self.batched_requests += len(group)
+        task = asyncio.ensure_future(self._run_batch(key, group))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def _infer_batch(self, key: Tuple[str, str], X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[dict]]:
+        """Вывод и ответы для группы (выполняется в потоке executor)"""
+        car_catalog = self.catalog.snapshot()
+        budget_membership, budgets = self.registry.infer(X, *key)
+        ids, diffs = car_catalog.closest_ids(budgets)
+        responses = [self._response(car_catalog, budget_membership[i], float(budgets[i]), int(ids[i]), diffs[i])
+                     for i in range(budgets.size)]
+        return budget_membership, budgets, responses
+
+    async def _run_batch(self, key: Tuple[str, str], group: List[tuple]):
+        X = np.array([values for values, _, _ in group])
+        try:
+            budget_membership, budgets, responses = await run_blocking(self.executor, self._infer_batch, key, X)
+        except Exception as e:
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # Кэш меняется только в потоке цикла событий
+        for i, (_, cache_key, future) in enumerate(group):
+            if cache_key is not None:
+                self.cache.store(cache_key, (budget_membership[i], float(budgets[i])))
+            if not future.done():
+                future.set_result(responses[i])
+
+
+class RecommendationService:
+    """HTTP/JSON сервис рекомендаций на asyncio без внешних зависимостей.
+
+    POST /forward, /backward и /fuzzy принимают те же поля, что и batch.py;
+    GET /stats возвращает число запросов, задержки p50/p99 и время этапов вывода.
+    Запрос /forward с полем session уточняет запрос этого сеанса пошагово.
+    POST /cars/add, /cars/update и /cars/delist изменяют каталог, не прерывая обслуживания:
+    каждый запрос работает с одним снимком каталога, взятым в его начале.
+    Параметр ?profile=1 добавляет к ответу отчет cProfile по этому запросу.
+    """
+
+    def __init__(self, car_catalog: Optional[Union[CarCatalog, LiveCatalog]] = None, registry: Optional[FuzzyParamRegistry] = None,
+                 batch_window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH,
+                 cache: Optional[FuzzyInferenceCache] = None,
+                 surfaces: Optional[Dict[Tuple[str, str], BudgetSurface]] = None):
+        car_catalog = catalog if car_catalog is None else car_catalog
+        self.live = car_catalog if isinstance(car_catalog, LiveCatalog) else LiveCatalog(car_catalog)
+        self.registry = fuzzy_registry if registry is None else registry
+        self.batcher = FuzzyBatcher(self.registry, self.live, batch_window, max_batch, cache, surfaces)
+        self.stats = LatencyStats()
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.profiling = False
+        self.sessions: "OrderedDict[str, ForwardChainingSession]" = OrderedDict()
+        self.routes = {"/forward": self.forward, "/backward": self.backward, "/fuzzy": self.fuzzy,
+                       "/cars/add": self.add_car, "/cars/update": self.update_car, "/cars/delist": self.delist_car}
+
+    @property
+    def catalog(self) -> CarCatalog:
+        """Текущий снимок каталога"""
+        return self.live.snapshot()
+
+    def forward_session(self, session_id: str, inputs: tuple) -> ForwardChainingSession:
+        car_catalog = self.catalog
+        session = self.sessions.pop(session_id, None)
+        if session is None or session.catalog is not car_catalog:
+            # Сеанс привязан к снимку; после изменения каталога он создается заново
+            session = ForwardChainingSession(car_catalog, inputs)
+        else:
+            session.set_inputs(inputs)
+        self.sessions[session_id] = session
+        if len(self.sessions) > MAX_SESSIONS:
+            self.sessions.popitem(last=False)
+        return session
+
+    async def forward(self, body: dict) -> dict:
+        inputs = parse_crisp_query(body)
+        if "session" in body:
+            results = self.forward_session(str(body["session"]), inputs).results()
+        else:
+            results = self.catalog.forward_chaining(inputs)
+        return {"cars": [{"name": car.name, "matches": matches, "price": car.price} for car, matches in results]}
+
+    async def backward(self, body: dict) -> dict:
+        car = self.catalog.backward_chaining(parse_crisp_query(body))
+        return {"name": car.name if car else None, "price": car.price if car else None}
+
+    async def fuzzy(self, body: dict) -> dict:
+        fuzzification_type = body.get("fuzzification", "triangular")
+        defuzzification_type = body.get("defuzzification", "center_of_gravity")
+        if fuzzification_type not in FUZZIFICATION_TYPES:
+            raise ValueError(f"неизвестный тип фаззификации: {fuzzification_type}")
+        if defuzzification_type not in DEFUZZIFICATION_TYPES:
+            raise ValueError(f"неизвестный тип дефаззификации: {defuzzification_type}")
+        return await self.batcher.infer(parse_fuzzy_query(body), fuzzification_type, defuzzification_type)
+
+    async def mutate(self, function, *args, **kwargs):
+        """Изменение каталога в потоке, чтобы сборка нового снимка не задерживала другие запросы"""
+        return await run_blocking(None, partial(function, *args, **kwargs))
+
+    async def add_car(self, body: dict) -> dict:
+        car_id = await self.mutate(self.live.add, {field: body[field] for field in CATALOG_FIELDS})
+        return {"id": car_id, "version": self.live.version}
+
+    async def update_car(self, body: dict) -> dict:
+        car_id = _car_id(body)
+        fields = {field: body[field] for field in EDITABLE_FIELDS if field in body}
+        await self.mutate(self.live.update, car_id, **fields)
+        return {"id": car_id, "version": self.live.version}
+
+    async def delist_car(self, body: dict) -> dict:
+        car_id = _car_id(body)
+        await self.mutate(self.live.delist, car_id)
+        return {"id": car_id, "version": self.live.version}
+
+    def stats_report(self) -> dict:
+        report = {"latency": self.stats.report(), "stages": profiler.report(), "catalog": self.live.stats(),
+                  "fuzzy_batches": self.batcher.batches, "fuzzy_batched_requests": self.batcher.batched_requests}
+        if self.batcher.cache is not None:
+            report["fuzzy_cache"] = self.batcher.cache.stats()
+        return report
+
+    async def profiled(self, handler, request: dict) -> dict:
+        """Выполнение одного запроса под cProfile; одновременно профилируется только один запрос"""
+        if self.profiling:
+            raise HTTPError(409, "другой запрос уже профилируется")
+        self.profiling = True
+        token = _profiled_request.set(True)
+        try:
+            with profile_request() as profile:
+                response = await handler(request)
+        finally:
+            _profiled_request.reset(token)
+            self.profiling = False
+        response["profile"] = profile.text()
+        return response
+
+    async def dispatch(self, method: str, path: str, body: bytes, profile: bool = False) -> dict:
+        if path == "/stats":
+            if method != "GET":
+                raise HTTPError(405, "ожидается GET")
+            return self.stats_report()
+        handler = self.routes.get(path)
+        if handler is None:
+            raise HTTPError(404, f"неизвестный путь {path}")
+        if method != "POST":
+            raise HTTPError(405, "ожидается POST")
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("тело запроса должно быть объектом JSON")
+            return await (self.profiled(handler, request) if profile else handler(request))
+        except KeyError as e:
+            raise HTTPError(400, f"отсутствует поле {e}")
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                path, _, query = target.partition("?")
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                started = time.perf_counter()
+                length = int(headers.get("content-length", 0))
+                try:
+                    if length > MAX_BODY_SIZE:
+                        raise HTTPError(413, "слишком большое тело запроса")
+                    body = await reader.readexactly(length) if length else b""
+                    status, response = 200, await self.dispatch(method, path, body, "profile=1" in query.split("&"))
+                except HTTPError as e:
+                    status, response = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, response = 500, {"error": str(e)}
+                if path in self.routes or path == "/stats":
+                    # Неизвестные пути не учитываются, иначе статистика растет без ограничений
+                    self.stats.record(path, time.perf_counter() - started)
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                payload = json.dumps(response, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive or status == 413:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """Запуск сервера; port=0 выбирает свободный порт"""
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HTTP сервис экспертной системы подбора автомобиля")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-c", "--catalog", help="каталог автомобилей: снимок, CSV или JSONL")
+    parser.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                        help="окно объединения нечетких запросов, мс")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--analytic", action="store_true", help="точная дефаззификация без сетки")
+    parser.add_argument("--profile", action="store_true", help="замер времени этапов вывода для /stats")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="размер LRU кэша нечеткого вывода (0 - без кэша)")
+    parser.add_argument("--cache-decimals", type=int, default=DEFAULT_CACHE_DECIMALS,
+                        help="число знаков после запятой при округлении входов для кэша")
+    parser.add_argument("--surface", action="append", default=[],
+                        help="папка поверхности бюджета из budget_surface.py (можно указать несколько)")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace):
+    car_catalog = load_catalog(args.catalog) if args.catalog else None
+    if args.profile:
+        profiler.enable()
+    registry = FuzzyParamRegistry(defuzzification_mode="analytic") if args.analytic else None
+    cache = FuzzyInferenceCache(args.cache_size, args.cache_decimals, registry, CACHE_CHECK_INTERVAL) \
+        if args.cache_size > 0 else None
+    service = RecommendationService(car_catalog, registry, args.batch_window / 1000, args.max_batch, cache,
+                                    load_surfaces(args.surface))
+    server = await service.start(args.host, args.port)
+    print(f"Сервис запущен на http://{args.host}:{service.port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None):
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from catalog import ATTRIBUTES, LEVEL_CODES, COMBINATION_CODES, COMBINATION_DISTANCES, CarCatalog, \
+    combination_index, encode_profile, query_combination
+from knowledge_base import CarSpecs
+from profiling import profiler
+
+# Списки инвертированного индекса по профилям: (номер атрибута, код уровня) -> 243 номера сочетаний
+PROFILE_POSTINGS = {
+    (j, code): np.flatnonzero(COMBINATION_CODES[:, j] == code)
+    for j in range(len(ATTRIBUTES)) for code in range(len(LEVEL_CODES[j]))
+}
+
+
+class ForwardChainingSession:
+    """Сеанс прямой цепочки с пошаговым изменением запроса.
+
+    Число совпадений хранится для каждого профиля каталога (у всех автомобилей группы
+    профиля оно одинаково), список подходящих автомобилей - отсортированным по номеру.
+    При смене значения одного атрибута счетчики меняются только у профилей из двух
+    списков индекса (старое и новое значение), а список подходящих - только на
+    автомобили групп, пересекших порог min_matches. Стоимость шага не зависит от
+    размера каталога, кроме самих добавленных и удаленных автомобилей.
+    """
+
+    def __init__(self, car_catalog: CarCatalog, inputs: Sequence, min_matches: int = 5):
+        self.catalog = car_catalog
+        self.groups = car_catalog.groups
+        self.min_matches = min_matches
+        self.query = encode_profile(inputs)
+        combination = query_combination(inputs)
+        self.profile_counts = (len(ATTRIBUTES) - COMBINATION_DISTANCES[combination]).astype(np.int8)
+        self.ids = np.sort(self.groups.expand(self.groups.matching(combination, min_matches)))
+        self.updates = 0
+
+    def update(self, attribute: Union[int, str], value) -> bool:
+        """Смена значения одного атрибута; возвращает False, если значение не изменилось"""
+        j = ATTRIBUTES.index(attribute) if isinstance(attribute, str) else attribute
+        old, new = int(self.query[j]), LEVEL_CODES[j][value]
+        if old == new:
+            return False
+        with profiler.stage("forward_session_update"):
+            lost = PROFILE_POSTINGS[(j, old)]
+            gained = PROFILE_POSTINGS[(j, new)]
+            self.profile_counts[lost] -= 1
+            self.profile_counts[gained] += 1
+            # Порог пересекают только профили из затронутых списков
+            dropped = lost[self.profile_counts[lost] == self.min_matches - 1]
+            reached = gained[self.profile_counts[gained] == self.min_matches]
+            ids = self.ids
+            if dropped.size:
+                members = np.sort(self.groups.expand(dropped))
+                ids = np.delete(ids, np.searchsorted(ids, members))
+            if reached.size:
+                members = np.sort(self.groups.expand(reached))
+                ids = np.insert(ids, np.searchsorted(ids, members), members)
+            self.ids = ids
+            self.query[j] = new
+            self.updates += 1
+        return True
+
+    def set_inputs(self, inputs: Sequence) -> int:
+        """Переход к новому запросу по одному атрибуту; возвращает число измененных атрибутов"""
+        return sum(self.update(j, value) for j, value in enumerate(inputs))
+
+    def matching_ids(self) -> np.ndarray:
+        """Номера подходящих автомобилей в порядке каталога"""
+        return self.ids
+
+    def match_counts(self, ids: np.ndarray) -> np.ndarray:
+        """Число совпадений для автомобилей ids"""
+        return self.profile_counts[combination_index(self.catalog.codes[ids])]
+
+    def results(self) -> List[Tuple[CarSpecs, int]]:
+        """Результат прямой цепочки для текущего запроса, как у CarCatalog.forward_chaining"""
+        return [(self.catalog.car(i), m) for i, m in zip(self.ids, self.match_counts(self.ids).tolist())]
@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+
+from batch import run
+from benchmark import synthetic_catalog
+from catalog import ATTRIBUTES
+from live_catalog import LiveCatalog
+
+CRISP_QUERY = {"power": "высокая", "max_speed": "средняя", "clearance": "маленький", "trunk_volume": "средний",
+               "fuel_consumption": "маленький", "dynamics": "высокая"}
+FUZZY_QUERY = {"power": 5, "max_speed": 6, "clearance": 4, "trunk_volume": 7, "fuel_consumption": 3, "dynamics": 8}
+
+
+def run_jsonl(mode: str, lines, **options):
+    output = io.StringIO()
+    count = run(mode, io.StringIO("".join(line + "\n" for line in lines)), output,
+                car_catalog=synthetic_catalog(300), **options)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert count == len(results)
+    return results
+
+
+@pytest.mark.parametrize("mode, query", [("forward", CRISP_QUERY), ("backward", CRISP_QUERY),
+                                         ("fuzzy", FUZZY_QUERY)])
+def test_bad_records_become_error_rows(mode, query):
+    lines = [json.dumps({"id": "a", **query}), "{не json", "[1, 2]", json.dumps({**query, "power": None}),
+             json.dumps({"dynamics": query["dynamics"]}), json.dumps({"id": "b", **query})]
+    results = run_jsonl(mode, lines, chunk_size=4)
+    assert [result["query"] for result in results] == list(range(6))
+    assert [result.get("id") for result in results] == ["a", None, None, None, None, "b"]
+    assert ["error" in result for result in results] == [False, True, True, True, True, False]
+    # Одинаковые запросы до и после ошибочных записей дают одинаковый ответ
+    assert {**results[0], "query": None, "id": None} == {**results[5], "query": None, "id": None}
+
+
+def test_fuzzy_csv_short_row():
+    header = ",".join(("id",) + ATTRIBUTES)
+    rows = ["1,5,6,4,7,3,8", "2,5,6", "3,5,6,4,7,3,abc", "4,9,9,9,9,9,9"]
+    output = io.StringIO()
+    run("fuzzy", io.StringIO("\n".join([header] + rows) + "\n"), output, "csv", synthetic_catalog(300))
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 5
+    errors = [line.split(",")[-1] for line in lines[1:]]
+    assert errors[0] == "" and errors[3] == ""
+    assert "clearance: None" in errors[1] and "dynamics: 'abc'" in errors[2]
+
+
+def test_fuzzy_results_match_registry():
+    from fuzzy_engine import fuzzy_registry
+    results = run_jsonl("fuzzy", [json.dumps(FUZZY_QUERY)], defuzzification_type="mean_of_maximum")
+    _, budgets = fuzzy_registry.infer([list(FUZZY_QUERY.values())], "triangular", "mean_of_maximum")
+    assert results[0]["budget"] == round(float(budgets[0]), 2)
+
+
+def test_fuzzy_on_catalog_without_listed_cars():
+    live = LiveCatalog(synthetic_catalog(3))
+    with live.transaction() as editor:
+        for car_id in range(3):
+            editor.delist(car_id)
+    output = io.StringIO()
+    assert run("fuzzy", io.StringIO(json.dumps(FUZZY_QUERY) + "\n"), output, car_catalog=live.snapshot()) == 1
+    assert "нет автомобилей" in json.loads(output.getvalue())["error"]
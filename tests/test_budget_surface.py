@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from budget_surface import DIMENSIONS, BudgetSurface, load_surfaces, main
+from fuzzy_engine import FuzzyParamRegistry
+
+POINTS = 3
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return FuzzyParamRegistry(defuzzification_mode="analytic").engine("triangular")
+
+
+@pytest.fixture(scope="module")
+def surface(engine):
+    return BudgetSurface.build(engine, "triangular", "center_of_gravity", POINTS)
+
+
+def test_nodes_equal_engine_budgets(engine, surface):
+    axis = np.linspace(1.0, 10.0, POINTS)
+    nodes = axis[np.stack(np.unravel_index(np.arange(POINTS ** DIMENSIONS), surface.values.shape), axis=1)]
+    expected = engine.infer(nodes, "center_of_gravity")[1]
+    np.testing.assert_allclose(surface.values.reshape(-1), expected)
+    # В узлах интерполяция возвращает само значение узла
+    np.testing.assert_allclose(surface.interpolate(nodes), expected)
+
+
+def test_interpolation_between_nodes(surface):
+    X = np.random.default_rng(3).uniform(1.0, 10.0, size=(2000, DIMENSIONS))
+    budgets = surface.interpolate(X)
+    assert np.all(budgets >= surface.values.min() - 1e-6)
+    assert np.all(budgets <= surface.values.max() + 1e-6)
+    # Линейная функция входов интерполируется точно; входы вне [1, 10] прижимаются к границам
+    weights = np.arange(1.0, DIMENSIONS + 1)
+    axis = np.linspace(1.0, 10.0, POINTS)
+    grid = np.stack(np.meshgrid(*[axis] * DIMENSIONS, indexing="ij"), axis=-1)
+    linear = BudgetSurface(grid @ weights, "triangular", "center_of_gravity")
+    np.testing.assert_allclose(linear.interpolate(X), X @ weights)
+    np.testing.assert_allclose(linear.interpolate([[0.0] * DIMENSIONS]), [weights.sum()])
+
+
+def test_save_load_round_trip(surface, tmp_path):
+    surface.save(str(tmp_path / "cog"))
+    loaded = BudgetSurface.load(str(tmp_path / "cog"))
+    assert isinstance(loaded.values, np.memmap)
+    assert (loaded.fuzzification_type, loaded.defuzzification_type) == ("triangular", "center_of_gravity")
+    X = np.random.default_rng(4).uniform(1.0, 10.0, size=(100, DIMENSIONS))
+    np.testing.assert_array_equal(loaded.interpolate(X), surface.interpolate(X))
+    surfaces = load_surfaces([str(tmp_path / "cog")])
+    assert list(surfaces) == [("triangular", "center_of_gravity")]
+
+
+def test_cli_writes_surface(surface, tmp_path, capsys):
+    main(["-o", str(tmp_path), "--points", str(POINTS), "--analytic", "--samples", "200"])
+    loaded = BudgetSurface.load(str(tmp_path), mmap=False)
+    np.testing.assert_allclose(loaded.values, surface.values)
+    assert loaded.meta["error"]["samples"] == 200
+    assert '"max_abs_error"' in capsys.readouterr().out
+
+
+def test_too_few_points(engine):
+    with pytest.raises(ValueError):
+        BudgetSurface.build(engine, points=1)
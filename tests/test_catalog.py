@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from benchmark import synthetic_catalog, synthetic_queries
+from catalog import (ANSWER_MIN_MATCHES, ATTRIBUTES, CarCatalog, CrispAnswerTable, combination_index,
+                     encode_profile)
+from live_catalog import LiveCatalog
+
+
+def coarse_catalog(n: int, seed: int = 0) -> CarCatalog:
+    """Каталог с грубыми ценами: много автомобилей с равной ценой"""
+    base = synthetic_catalog(n, seed)
+    return CarCatalog(base.codes, base.prices // 500000 * 500000, base.name_offsets, base.name_data)
+
+
+def test_closest_ids_match_linear_scan():
+    car_catalog = coarse_catalog(300)
+    budgets = np.linspace(0, 10000000, 501)
+    ids, diffs = car_catalog.closest_ids(budgets)
+    for budget, car_id, diff in zip(budgets, ids.tolist(), diffs.tolist()):
+        differences = np.abs(car_catalog.prices - budget)
+        # Первый в порядке каталога автомобиль с наименьшей разницей
+        assert car_id == int(np.argmin(differences)) and diff == differences.min()
+    car, diff = car_catalog.closest_car(budgets[10])
+    assert car == car_catalog.car(ids[10]) and diff == diffs[10]
+
+
+def test_k_closest_and_price_range():
+    car_catalog = coarse_catalog(300, 1)
+    ids = car_catalog.k_closest_ids(3200000, 7)
+    differences = np.abs(car_catalog.prices - 3200000)
+    assert ids.tolist() == np.lexsort((np.arange(300), differences))[:7].tolist()
+    in_range = car_catalog.price_range_ids(2000000, 3000000)
+    expected = np.flatnonzero((car_catalog.prices >= 2000000) & (car_catalog.prices <= 3000000))
+    assert sorted(in_range.tolist()) == expected.tolist()
+    assert np.all(np.diff(car_catalog.prices[in_range]) >= 0)
+
+
+def test_closest_on_catalog_without_listed_cars():
+    live = LiveCatalog(synthetic_catalog(5))
+    with live.transaction() as editor:
+        for car_id in range(5):
+            editor.delist(car_id)
+    car_catalog = live.snapshot()
+    with pytest.raises(ValueError):
+        car_catalog.closest_ids([3000000.0])
+    with pytest.raises(ValueError):
+        car_catalog.closest_car(3000000.0)
+    assert car_catalog.k_closest_ids(3000000.0, 3).size == 0
+    assert car_catalog.price_range_ids(0, 1e9).size == 0
+
+
+def test_answer_table_matches_linear_scan():
+    car_catalog = synthetic_catalog(400, 2)
+    for inputs in synthetic_queries(40, 3):
+        counts = car_catalog.match_counts(inputs)
+        exact = np.flatnonzero(counts == len(ATTRIBUTES))
+        assert car_catalog.exact_match_ids(inputs).tolist() == exact.tolist()
+        backward = car_catalog.backward_chaining(inputs)
+        assert backward == (car_catalog.car(exact[0]) if exact.size else None)
+        assert [car for car, _ in car_catalog.forward_chaining(inputs)] == \
+            [car_catalog.car(i) for i in np.flatnonzero(counts >= ANSWER_MIN_MATCHES)]
+        # Другой порог считается по группам профилей
+        assert [m for _, m in car_catalog.forward_chaining(inputs, 3)] == counts[counts >= 3].tolist()
+
+
+def test_answer_table_add_remove_and_arrays():
+    car_catalog = synthetic_catalog(200, 4)
+    table = car_catalog.answers.copy()
+    combinations = combination_index(car_catalog.codes)
+    for car_id in (5, 17, 199):
+        table.remove(car_id, int(combinations[car_id]))
+    ids = np.setdiff1d(np.arange(200), [5, 17, 199])
+    rebuilt = CrispAnswerTable.build(car_catalog.codes, ids=ids)
+    for name, values in rebuilt.arrays().items():
+        np.testing.assert_array_equal(table.arrays()[name], values, err_msg=name)
+    # Исходная таблица не изменилась
+    assert 17 in car_catalog.answers.exact[combinations[17]]
+    for car_id in (199, 5, 17):
+        table.add(car_id, int(combinations[car_id]))
+    restored = CrispAnswerTable.from_arrays(**table.arrays())
+    for name, values in car_catalog.answers.arrays().items():
+        np.testing.assert_array_equal(restored.arrays()[name], values, err_msg=name)
+
+
+def brute_top_k(car_catalog, inputs, k, weights, target_price):
+    matches = car_catalog.codes == encode_profile(inputs)
+    scores = matches.sum(axis=1) if weights is None else matches @ np.asarray(weights, dtype=float)
+    prices = car_catalog.prices
+    price_key = prices if target_price is None else np.abs(prices - target_price)
+    ids = car_catalog.listed_ids()
+    ids = ids[np.lexsort((ids, price_key[ids], -scores[ids]))][:k]
+    return [(i, float(scores[i])) for i in ids]
+
+
+@pytest.mark.parametrize("weights", [None, (3.0, 1.0, 0.5, 2.0, 1.0, 0.25)])
+@pytest.mark.parametrize("target_price", [None, 2500000.0])
+def test_top_k_matches_brute_force(weights, target_price):
+    live = LiveCatalog(synthetic_catalog(500, 5))
+    with live.transaction() as editor:
+        for car_id in range(0, 500, 7):
+            editor.delist(car_id)
+    car_catalog = live.snapshot()
+    for inputs in synthetic_queries(20, 6):
+        for k in (1, 5, 40):
+            result = car_catalog.top_k(inputs, k, weights, target_price)
+            expected = brute_top_k(car_catalog, inputs, k, weights, target_price)
+            assert [(car, pytest.approx(score)) for car, score in result] == \
+                [(car_catalog.car(i), score) for i, score in expected]
@@ -0,0 +1,85 @@
+import copy
+
+import numpy as np
+import pytest
+
+from benchmark import synthetic_profiles
+from fuzzy_engine import BUDGET_LEVELS, BUDGET_RANGE, DEFAULT_BUDGET, DEFUZZIFICATION_TYPES, BudgetCurveCache, \
+    FuzzyEngine, FuzzyInferenceCache, FuzzyParamRegistry
+from knowledge_base import Budget, BUDGET_PARAMS, FUZZY_PARAM_SETS, fuzzy_rules, make_membership_function
+
+# Мелкая сетка бюджета, с которой сравнивается точная дефаззификация
+FINE_GRID_SIZE = 100001
+FINE_STEP = (BUDGET_RANGE[1] - BUDGET_RANGE[0]) / (FINE_GRID_SIZE - 1)
+
+
+@pytest.mark.parametrize("defuzzification_type", DEFUZZIFICATION_TYPES)
+def test_analytic_matches_fine_grid(defuzzification_type):
+    X = synthetic_profiles(500, 11)
+    membership, analytic = FuzzyEngine(defuzzification_mode="analytic").infer(X, defuzzification_type)
+    _, grid = FuzzyEngine(grid_size=FINE_GRID_SIZE).infer(X, defuzzification_type)
+    if defuzzification_type != "center_of_gravity":
+        # При равных максимумах в разных точках сетка выбирает точку по ошибке округления
+        top = np.sort(membership, axis=1)
+        unique = ~np.isclose(top[:, -1], top[:, -2])
+        assert unique.sum() > 100
+        analytic, grid = analytic[unique], grid[unique]
+    np.testing.assert_allclose(analytic, grid, atol=2 * FINE_STEP)
+
+
+def test_cache_invalidates_on_parameter_edits():
+    registry = FuzzyParamRegistry(copy.deepcopy(FUZZY_PARAM_SETS), copy.deepcopy(fuzzy_rules),
+                                  copy.deepcopy(BUDGET_PARAMS))
+    cache = FuzzyInferenceCache(registry=registry)
+    values = [5.0, 6.0, 4.0, 7.0, 3.0, 8.0]
+
+    def cached_budget():
+        return cache.get(values, "triangular", "center_of_gravity",
+                         lambda x: float(registry.infer([x], "triangular")[1][0]))
+
+    def fresh_budget():
+        engine = FuzzyEngine(registry.rules, registry.param_sets["triangular"], registry.budget_params)
+        return float(engine.infer([values])[1][0])
+
+    budget = cached_budget()
+    assert cached_budget() == budget and cache.hits == 1
+    registry.budget_params["средний"]["params"][1] = 3000000
+    assert cached_budget() != budget
+
+    edits = [
+        lambda: registry.budget_params["средний"].update(params=[1000000, 2500000, 4000000]),
+        lambda: registry.param_sets["triangular"]["мощность"]["средняя"].update(params=[2, 4, 6]),
+        lambda: registry.rules[0]["then"].update({"бюджет": registry.rules[-1]["then"]["бюджет"]}),
+        lambda: registry.rules.pop(),
+    ]
+    for edit in edits:
+        edit()
+        assert cached_budget() == pytest.approx(fresh_budget())
+    assert cache.invalidations == len(edits) + 1 and registry.version == len(edits) + 1
+
+
+def test_grid_defuzzification_matches_reference():
+    engine = FuzzyEngine()
+    membership, budgets = engine.infer(synthetic_profiles(300, 12), "center_of_gravity")
+    x, curves = engine.budget_curve_cache.get()
+    for row, budget in zip(membership, budgets):
+        # Агрегированная кривая, как в CarExpertSystemGUI.fuzzy_inference
+        y = sum(level_membership * curve for level_membership, curve in zip(row, curves))
+        assert budget == pytest.approx(float(np.sum(x * y) / np.sum(y)))
+    # Растущая и спадающая кривые уровней "высокий" и "очень высокий" дают плато на отрезке [5 млн, 7 млн]
+    step = x[1] - x[0]
+    plateau = np.array([[0.5, 0.5, 0.0, 0.0, 0.0]])
+    assert engine.defuzzify(plateau, "mean_of_maximum")[0] == pytest.approx(6000000, abs=step)
+    assert engine.defuzzify(plateau, "maximum_membership")[0] == pytest.approx(5000000, abs=step)
+    assert engine.defuzzify(np.zeros((1, 5)), "center_of_gravity")[0] == DEFAULT_BUDGET
+
+
+def test_budget_curves_follow_parameter_edits():
+    budget_params = copy.deepcopy(BUDGET_PARAMS)
+    cache = BudgetCurveCache(budget_params)
+    x, curves = cache.get(101)
+    assert cache.get(101)[1] is curves
+    budget_params["средний"]["params"] = [1000000, 1500000, 2000000]
+    _, updated = cache.get(101)
+    assert updated is not curves
+    np.testing.assert_allclose(updated[BUDGET_LEVELS.index(Budget.MEDIUM)], make_membership_function("triangular", [1000000, 1500000, 2000000])(x))
@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+import pytest
+
+from benchmark import synthetic_catalog, synthetic_queries
+from catalog import ATTRIBUTES, LEVEL_MEMBERS, CarCatalog
+from live_catalog import LiveCatalog
+
+
+def _random_car(rng: random.Random, name: str) -> dict:
+    return {"name": name, "price": rng.randrange(10, 60) * 100000,
+            **{attribute: LEVEL_MEMBERS[j][rng.randrange(3)] for j, attribute in enumerate(ATTRIBUTES)}}
+
+
+def _rebuilt(snapshot: CarCatalog) -> CarCatalog:
+    """Каталог, построенный с нуля из записей снимка, с той же маской снятых с продажи"""
+    records = [{"name": car.name, "price": car.price, **dict(zip(ATTRIBUTES, (getattr(car, a) for a in ATTRIBUTES)))}
+               for car in map(snapshot.car, range(len(snapshot)))]
+    full = CarCatalog.from_records(records)
+    return CarCatalog(full.codes, full.prices, full.name_offsets, full.name_data, active=snapshot.active.copy())
+
+
+def _assert_equivalent(actual: CarCatalog, expected: CarCatalog, queries):
+    actual_arrays, expected_arrays = actual.arrays(), expected.arrays()
+    assert actual_arrays.keys() == expected_arrays.keys()
+    for name, values in expected_arrays.items():
+        np.testing.assert_array_equal(actual_arrays[name], values, err_msg=name)
+    assert actual.listed == expected.listed
+    for inputs in queries:
+        for min_matches in (0, 4, 5, 6):
+            assert actual.forward_chaining(inputs, min_matches) == expected.forward_chaining(inputs, min_matches)
+        assert actual.backward_chaining(inputs) == expected.backward_chaining(inputs)
+        assert actual.top_k(inputs, 5, target_price=3e6) == expected.top_k(inputs, 5, target_price=3e6)
+    budgets = np.linspace(5e5, 9e6, 200)
+    for actual_values, expected_values in zip(actual.closest_ids(budgets), expected.closest_ids(budgets)):
+        np.testing.assert_array_equal(actual_values, expected_values)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_mutations_match_full_rebuild(seed):
+    rng = random.Random(seed)
+    base = synthetic_catalog(500, seed)
+    # Грубые цены дают много равных цен, на которых проверяется порядок по номеру
+    base = CarCatalog(base.codes, base.prices // 500000 * 500000, base.name_offsets, base.name_data)
+    live = LiveCatalog(base)
+    queries = synthetic_queries(20, seed + 1)
+
+    for step in range(60):
+        before = live.snapshot()
+        before_arrays = {name: values.copy() for name, values in before.arrays().items()}
+        with live.transaction() as editor:
+            for i in range(rng.randint(1, 5)):
+                action = rng.random()
+                car_id = rng.randrange(len(editor))
+                try:
+                    if action < 0.3:
+                        editor.add(_random_car(rng, f"new-{step}-{i}"))
+                    elif action < 0.5:
+                        editor.delist(car_id)
+                    elif action < 0.6:
+                        editor.update(car_id, name=f"renamed-{step}")
+                    else:
+                        fields = {attribute: LEVEL_MEMBERS[j][rng.randrange(3)].value
+                                  for j, attribute in enumerate(ATTRIBUTES) if rng.random() < 0.3}
+                        if rng.random() < 0.5:
+                            fields["price"] = rng.randrange(10, 60) * 100000
+                        editor.update(car_id, **fields)
+                except ValueError:
+                    pass  # автомобиль уже снят с продажи
+        # Снимок, взятый до изменения, остается прежним
+        for name, values in before.arrays().items():
+            np.testing.assert_array_equal(values, before_arrays[name], err_msg=name)
+        if step % 15 == 0:
+            _assert_equivalent(live.snapshot(), _rebuilt(live.snapshot()), queries)
+
+    _assert_equivalent(live.snapshot(), _rebuilt(live.snapshot()), queries)
+
+
+def test_invalid_values_raise_value_error():
+    live = LiveCatalog(synthetic_catalog(10))
+    with pytest.raises(ValueError):
+        live.update(0, power=7)
+    with pytest.raises(ValueError):
+        live.add({"name": "x", "price": "дорого", **{attribute: "высокая" for attribute in ATTRIBUTES}})
+    live.delist(1)
+    with pytest.raises(ValueError):
+        live.update(1, price=1000000)
+    assert live.version == 1
+
+
+@pytest.mark.parametrize("car_id", [-1, -100, 10, 11])
+def test_unknown_ids_are_rejected(car_id):
+    live = LiveCatalog(synthetic_catalog(10))
+    before = live.snapshot()
+    with pytest.raises(ValueError):
+        live.update(car_id, price=100)
+    with pytest.raises(ValueError):
+        live.delist(car_id)
+    assert live.snapshot() is before and live.version == 0
@@ -0,0 +1,61 @@
+import io
+import json
+
+import numpy as np
+
+from batch import run
+from benchmark import synthetic_catalog, synthetic_profiles
+from parallel import ParallelExecutor, attach_arrays, share_arrays
+
+
+def _budgets(chunk, car_catalog, registry):
+    _, budgets = registry.infer(chunk)
+    ids, _ = car_catalog.closest_ids(budgets)
+    return budgets, ids
+
+
+def test_shared_arrays_round_trip():
+    arrays = {"a": np.arange(10, dtype=np.int32), "b": np.linspace(0, 1, 7), "empty": np.empty(0)}
+    descriptors, blocks = share_arrays(arrays)
+    try:
+        attached, attached_blocks = attach_arrays(descriptors)
+        for name, values in arrays.items():
+            np.testing.assert_array_equal(attached[name], values)
+            assert not attached[name].flags.writeable
+        for block in attached_blocks:
+            block.close()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def test_executor_results_in_input_order():
+    from fuzzy_engine import fuzzy_registry
+    car_catalog = synthetic_catalog(500)
+    chunks = np.array_split(synthetic_profiles(1000, 3), 9)
+    with ParallelExecutor(car_catalog, processes=2) as executor:
+        results = list(executor.map(_budgets, chunks))
+    assert len(results) == len(chunks)
+    for chunk, (budgets, ids) in zip(chunks, results):
+        expected_budgets, expected_ids = _budgets(chunk, car_catalog, fuzzy_registry)
+        np.testing.assert_allclose(budgets, expected_budgets)
+        np.testing.assert_array_equal(ids, expected_ids)
+
+
+def test_parallel_batch_output_matches_serial():
+    lines = [json.dumps({"id": i, **dict(zip(("power", "max_speed", "clearance", "trunk_volume",
+                                               "fuel_consumption", "dynamics"), row.tolist()))})
+             for i, row in enumerate(synthetic_profiles(300, 4))]
+    lines[7], lines[100] = "{не json", ""
+    lines[50] = json.dumps({"power": None})
+    text = "\n".join(lines) + "\n"
+    car_catalog = synthetic_catalog(500)
+    outputs = []
+    for processes in (1, 2):
+        output = io.StringIO()
+        count = run("fuzzy", io.StringIO(text), output, car_catalog=car_catalog, chunk_size=64,
+                    processes=processes)
+        assert count == 299
+        outputs.append(output.getvalue())
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from benchmark import synthetic_catalog
+from service import RecommendationService
+
+FUZZY_QUERY = {"power": 5, "max_speed": 6, "clearance": 4, "trunk_volume": 7, "fuel_consumption": 3, "dynamics": 8}
+
+
+async def request(service: RecommendationService, method: str, path: str, body=None):
+    """Один HTTP запрос к запущенному сервису; возвращает (статус, ответ)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+    payload = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+                 .encode("latin-1") + payload)
+    await writer.drain()
+    status_line = await reader.readline()
+    response = await reader.read()
+    writer.close()
+    return int(status_line.split()[1]), json.loads(response.partition(b"\r\n\r\n")[2])
+
+
+def serve(test, **options):
+    """Запуск сервиса на свободном порту на время сопрограммы test(service)"""
+    async def main():
+        service = RecommendationService(synthetic_catalog(200), **options)
+        await service.start(port=0)
+        try:
+            return await test(service)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+def test_fuzzy_and_errors():
+    async def test(service):
+        status, response = await request(service, "POST", "/fuzzy", FUZZY_QUERY)
+        assert status == 200 and {"budget", "membership", "name", "price"} <= response.keys()
+        assert (await request(service, "POST", "/fuzzy", {**FUZZY_QUERY, "power": 11}))[0] == 400
+        assert (await request(service, "POST", "/fuzzy", {"power": 5}))[0] == 400
+        assert (await request(service, "POST", "/fuzzy", {**FUZZY_QUERY, "power": None}))[0] == 400
+        assert (await request(service, "POST", "/fuzzy", [1, 2]))[0] == 400
+        assert (await request(service, "GET", "/fuzzy"))[0] == 405
+        assert (await request(service, "POST", "/unknown", {}))[0] == 404
+        status, stats = await request(service, "GET", "/stats")
+        assert status == 200
+        # Неизвестные пути в статистику не попадают
+        assert set(stats["latency"]) == {"/fuzzy"}
+    serve(test)
+
+
+def test_full_batch_does_not_shorten_next_window():
+    async def test(service):
+        batcher = service.batcher
+        await asyncio.gather(*(batcher.infer([float(i + 1)] * 6, "triangular", "center_of_gravity")
+                               for i in range(3)))
+        assert batcher.batches == 1
+        # Запросы следующей группы ждут полное окно, а не таймер заполненной группы
+        await asyncio.sleep(0.3)
+        first = asyncio.ensure_future(batcher.infer([2.0] * 6, "triangular", "center_of_gravity"))
+        await asyncio.sleep(0.3)
+        second = asyncio.ensure_future(batcher.infer([3.0] * 6, "triangular", "center_of_gravity"))
+        await asyncio.gather(first, second)
+        assert batcher.batches == 2 and batcher.batched_requests == 5
+    serve(test, batch_window=0.5, max_batch=3)
+
+
+def test_catalog_edits():
+    async def test(service):
+        status, response = await request(service, "POST", "/cars/update", {"id": 3, "price": 1000000})
+        assert status == 200 and response == {"id": 3, "version": 1}
+        assert int(service.catalog.prices[3]) == 1000000
+        for body in ({"id": None}, {"id": []}, {"id": "x"}, {}, {"id": -1, "price": 1}, {"id": 3, "power": 7},
+                     {"id": 3, "price": None}):
+            assert (await request(service, "POST", "/cars/update", body))[0] == 400, body
+        assert (await request(service, "POST", "/cars/delist", {"id": None}))[0] == 400
+        assert (await request(service, "POST", "/cars/delist", {"id": "3"}))[1] == {"id": 3, "version": 2}
+        assert (await request(service, "POST", "/cars/delist", {"id": 3}))[0] == 400
+        assert service.live.version == 2
+    serve(test)
+
+
+def test_profiled_request_includes_inference():
+    async def test(service):
+        status, response = await request(service, "POST", "/fuzzy?profile=1", FUZZY_QUERY)
+        assert status == 200 and "budget" in response
+        assert "fuzzify" in response["profile"] and "defuzzify" in response["profile"]
+        status, response = await request(service, "POST", "/cars/delist?profile=1", {"id": 0})
+        assert status == 200 and "commit" in response["profile"]
+        assert (await request(service, "POST", "/fuzzy", FUZZY_QUERY))[0] == 200
+        assert service.batcher.batches == 1
+    serve(test)
+
+
+def test_fuzzy_without_listed_cars():
+    async def test(service):
+        for car_id in range(len(service.catalog)):
+            service.live.delist(car_id)
+        status, response = await request(service, "POST", "/fuzzy", FUZZY_QUERY)
+        assert status == 400 and "нет автомобилей" in response["error"]
+    serve(test)
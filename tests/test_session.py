@@ -0,0 +1,23 @@
+from benchmark import synthetic_catalog, synthetic_queries
+from session import ForwardChainingSession
+
+
+def test_session_matches_forward_chaining():
+    car_catalog = synthetic_catalog(2000, 3)
+    queries = synthetic_queries(100, 4)
+    for min_matches in (3, 5, 6):
+        session = ForwardChainingSession(car_catalog, queries[0], min_matches)
+        for inputs in queries:
+            session.set_inputs(inputs)
+            assert session.results() == car_catalog.forward_chaining(inputs, min_matches)
+
+
+def test_single_attribute_updates():
+    car_catalog = synthetic_catalog(1000, 5)
+    inputs = list(synthetic_queries(1, 6)[0])
+    session = ForwardChainingSession(car_catalog, inputs)
+    for j, value in enumerate(synthetic_queries(1, 7)[0]):
+        changed = session.update(j, value)
+        assert changed == (inputs[j] != value)
+        inputs[j] = value
+        assert session.results() == car_catalog.forward_chaining(inputs)
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from worker import BackgroundWorker, check_cancelled
+
+
+def wait_idle(worker: BackgroundWorker, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while worker.busy and time.monotonic() < deadline:
+        worker.poll()
+        time.sleep(0.01)
+    worker.poll()
+
+
+def test_new_job_cancels_running_job_at_next_check():
+    worker = BackgroundWorker()
+    started, release, stages = threading.Event(), threading.Event(), []
+    results = []
+
+    def slow(cancelled):
+        started.set()
+        release.wait(5)
+        stages.append("inference")
+        check_cancelled(cancelled)
+        stages.append("formatting")
+        return "old"
+
+    worker.submit(slow, results.append)
+    started.wait(5)
+    worker.submit(lambda cancelled: "new", results.append)
+    release.set()
+    wait_idle(worker)
+    assert results == ["new"]
+    # Начатый этап доводится до конца, следующий за проверкой - нет
+    assert stages == ["inference"]
+
+
+def test_cancel_drops_pending_and_running_results():
+    worker = BackgroundWorker()
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def job(cancelled):
+        started.set()
+        release.wait(5)
+        return "stale"
+
+    worker.submit(job, results.append)
+    started.wait(5)
+    worker.cancel()
+    release.set()
+    wait_idle(worker)
+    assert results == [] and not worker.busy
@@ -0,0 +1,86 @@
+from typing import Callable, Dict, Iterator, List, NamedTuple
+
+from knowledge_base import CarSpecs
+
+
+class TraceEvent(NamedTuple):
+    kind: str
+    data: tuple
+
+
+def _section(title: str) -> Iterator[str]:
+    yield f"\n{title}:"
+
+
+def _membership(inputs: Dict[str, float], membership_values: Dict[str, Dict[str, float]]) -> Iterator[str]:
+    for param, levels in membership_values.items():
+        yield f"\n{param} (значение: {inputs[param]}):"
+        for level, value in levels.items():
+            yield f"- {level}: {value:.3f}"
+
+
+def _rules(rules: List[dict], strengths: List[float]) -> Iterator[str]:
+    for i, (rule, strength) in enumerate(zip(rules, strengths), 1):
+        yield f"Правило {i}: {rule['then']['бюджет'].value} = {strength:.3f}"
+
+
+def _budget_levels(budget_membership: dict) -> Iterator[str]:
+    for budget_level, membership in budget_membership.items():
+        if membership > 0:
+            yield f"{budget_level.value}: {membership:.3f}"
+
+
+def _warning(message: str) -> Iterator[str]:
+    yield f"\nПредупреждение: {message}"
+
+
+def _check(car: CarSpecs) -> Iterator[str]:
+    yield f"\nПроверка {car.name}:"
+    yield f"- Мощность: {car.power.value} ✓"
+    yield f"- Макс. скорость: {car.max_speed.value} ✓"
+    yield f"- Клиренс: {car.clearance.value} ✓"
+    yield f"- Объем багажника: {car.trunk_volume.value} ✓"
+    yield f"- Расход топлива: {car.fuel_consumption.value} ✓"
+    yield f"- Динамика: {car.dynamics.value} ✓"
+    yield f"Вариант {car.name} подходит. Проверка окончена."
+
+
+# Форматирование событий по виду; текст строится только при чтении трассы
+RENDERERS: Dict[str, Callable[..., Iterator[str]]] = {
+    "section": _section,
+    "membership": _membership,
+    "rules": _rules,
+    "budget_levels": _budget_levels,
+    "warning": _warning,
+    "check": _check,
+}
+
+
+class Trace:
+    """Структурированная трасса рассуждений.
+
+    События хранят ссылки на уже вычисленные значения (принадлежности, силы правил),
+    строки текста формируются лениво при обходе lines() или вызове text().
+    Код вывода принимает trace=None, и тогда трасса не ведется вовсе.
+    """
+
+    __slots__ = ("events",)
+
+    def __init__(self):
+        self.events: List[TraceEvent] = []
+
+    def add(self, kind: str, *data):
+        self.events.append(TraceEvent(kind, data))
+
+    def __iter__(self) -> Iterator[TraceEvent]:
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def lines(self) -> Iterator[str]:
+        for event in self.events:
+            yield from RENDERERS[event.kind](*event.data)
+
+    def text(self) -> str:
+        return "\n".join(self.lines())
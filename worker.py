@@ -0,0 +1,115 @@
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+# Период опроса готовых результатов из главного цикла Tk (мс)
+POLL_INTERVAL_MS = 50
+
+# Функция задания получает событие отмены и проверяет его между шагами
+JobFunction = Callable[[threading.Event], Any]
+
+
+class JobCancelled(Exception):
+    """Задание прервано, потому что запущено более новое"""
+
+
+def check_cancelled(cancelled: Optional[threading.Event]):
+    if cancelled is not None and cancelled.is_set():
+        raise JobCancelled()
+
+
+class Job:
+    __slots__ = ("id", "function", "on_done", "on_error", "cancelled")
+
+    def __init__(self, job_id: int, function: JobFunction, on_done: Callable[[Any], None],
+                 on_error: Optional[Callable[[Exception], None]]):
+        self.id = job_id
+        self.function = function
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = threading.Event()
+
+
+class BackgroundWorker:
+    """Выполнение заданий вывода в фоновом потоке с доставкой результатов в главный поток.
+
+    Одновременно выполняется одно задание. Новое задание отменяет выполняемое и вытесняет
+    ожидающее; результат отмененного задания не доставляется. Задание само решает, где
+    проверять отмену: check_cancelled между этапами (перед выводом, после него, перед
+    форматированием строк) прерывает его, но этап, который уже начался, доводится до конца.
+    Обработчики on_done и on_error вызываются только из poll(), который интерфейс вызывает
+    через root.after, поэтому виджеты трогает только главный поток.
+    """
+
+    def __init__(self, name: str = "inference-worker"):
+        self.condition = threading.Condition()
+        self.pending: Optional[Job] = None
+        self.current: Optional[Job] = None
+        self.latest_id = 0
+        self.results: "queue.Queue[tuple]" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, function: JobFunction, on_done: Callable[[Any], None],
+               on_error: Optional[Callable[[Exception], None]] = None) -> Job:
+        with self.condition:
+            self.latest_id += 1
+            job = Job(self.latest_id, function, on_done, on_error)
+            for stale in (self.current, self.pending):
+                if stale is not None:
+                    stale.cancelled.set()
+            self.pending = job
+            self.condition.notify()
+        return job
+
+    def cancel(self):
+        """Отмена выполняемого и ожидающего заданий"""
+        with self.condition:
+            self.latest_id += 1
+            for stale in (self.current, self.pending):
+                if stale is not None:
+                    stale.cancelled.set()
+            self.pending = None
+
+    @property
+    def busy(self) -> bool:
+        """Есть задание, результат которого еще не доставлен"""
+        with self.condition:
+            return self.pending is not None or self.current is not None or not self.results.empty()
+
+    def poll(self) -> int:
+        """Вызов обработчиков готовых заданий в текущем (главном) потоке; возвращает их число"""
+        delivered = 0
+        while True:
+            try:
+                job, result, error = self.results.get_nowait()
+            except queue.Empty:
+                return delivered
+            # Результаты заданий, после которых было запущено новое, отбрасываются
+            if job.id != self.latest_id or job.cancelled.is_set():
+                continue
+            if error is None:
+                job.on_done(result)
+            elif job.on_error is not None:
+                job.on_error(error)
+            delivered += 1
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                job, self.pending = self.pending, None
+                self.current = job
+            result = error = None
+            try:
+                result = job.function(job.cancelled)
+            except JobCancelled:
+                job.cancelled.set()
+            except Exception as e:
+                error = e
+            # Задание остается текущим, пока его результат не попадет в очередь
+            with self.condition:
+                if not job.cancelled.is_set():
+                    self.results.put((job, result, error))
+                self.current = None